@@ -6,7 +6,7 @@ import sys
 from alembic import context
 sys.path.append("/app")
 from app.db.base import Base
-from app.models import user,role,refresh_token,embedding,case,case_file
+from app.models import user,role,refresh_token,embedding,case,case_file,chunk_posting,embedding_cache
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
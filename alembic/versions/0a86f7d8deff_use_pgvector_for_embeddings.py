@@ -0,0 +1,45 @@
+"""use pgvector for embeddings.vector + hnsw index
+
+Revision ID: 0a86f7d8deff
+Revises: 4703a5ca5b67
+Create Date: 2026-10-17 09:12:31.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a86f7d8deff'
+down_revision: Union[str, Sequence[str], None] = '4703a5ca5b67'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+EMBEDDING_DIMENSIONS = 1536
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    op.execute(
+        f"ALTER TABLE embeddings "
+        f"ALTER COLUMN vector TYPE vector({EMBEDDING_DIMENSIONS}) "
+        f"USING vector::vector({EMBEDDING_DIMENSIONS})"
+    )
+    op.create_index(op.f('ix_embeddings_file_id'), 'embeddings', ['file_id'], unique=False)
+    op.execute(
+        "CREATE INDEX ix_embeddings_vector_hnsw ON embeddings "
+        "USING hnsw (vector vector_cosine_ops) WITH (m = 16, ef_construction = 64)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS ix_embeddings_vector_hnsw")
+    op.drop_index(op.f('ix_embeddings_file_id'), table_name='embeddings')
+    op.execute(
+        "ALTER TABLE embeddings "
+        "ALTER COLUMN vector TYPE double precision[] "
+        "USING vector::real[]::double precision[]"
+    )
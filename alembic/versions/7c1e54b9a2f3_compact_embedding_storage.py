@@ -0,0 +1,41 @@
+"""compact embedding storage (float32 / int8 bytea) + backfill
+
+Revision ID: 7c1e54b9a2f3
+Revises: 0a86f7d8deff
+Create Date: 2026-10-17 11:40:07.118294
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+from app.reencode_embeddings import reencode_embeddings
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e54b9a2f3'
+down_revision: Union[str, Sequence[str], None] = '0a86f7d8deff'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('embeddings', sa.Column('vector_blob', sa.LargeBinary(), nullable=True))
+    op.add_column('embeddings', sa.Column('vector_scale', sa.Float(), nullable=True))
+    op.alter_column('embeddings', 'vector', nullable=True)
+
+    # later mode changes: python -m app.reencode_embeddings
+    mode = (settings.EMBEDDING_STORAGE_MODE or "pgvector").lower()
+    if mode != "pgvector":
+        reencode_embeddings(op.get_bind(), mode)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    reencode_embeddings(op.get_bind(), "pgvector")
+    op.alter_column('embeddings', 'vector', nullable=False)
+    op.drop_column('embeddings', 'vector_scale')
+    op.drop_column('embeddings', 'vector_blob')
@@ -0,0 +1,86 @@
+"""add bm25 chunk_postings + embeddings.token_count
+
+Revision ID: b3d9f0e6c8a1
+Revises: 7c1e54b9a2f3
+Create Date: 2026-10-17 13:05:52.660413
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.lexical import posting_rows
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d9f0e6c8a1'
+down_revision: Union[str, Sequence[str], None] = '7c1e54b9a2f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 200
+
+
+def _backfill_postings(conn) -> None:
+    """
+    Index the chunks that already exist, streaming BATCH_SIZE chunks at a time.
+    """
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.text(
+                "SELECT e.id, e.chunk_text, f.case_id FROM embeddings e "
+                "JOIN case_files f ON f.id = e.file_id "
+                "WHERE e.id > :last_id ORDER BY e.id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).fetchall()
+
+        if not rows:
+            break
+
+        lengths = []
+        postings = []
+        for row in rows:
+            for embedding_id, length, entries in posting_rows(row.case_id, [(row.id, row.chunk_text)]):
+                lengths.append({"id": embedding_id, "length": length})
+                postings.extend(entries)
+
+        conn.execute(
+            sa.text("UPDATE embeddings SET token_count = :length WHERE id = :id"),
+            lengths,
+        )
+        if postings:
+            conn.execute(
+                sa.text(
+                    "INSERT INTO chunk_postings (embedding_id, term, case_id, tf) "
+                    "VALUES (:embedding_id, :term, :case_id, :tf)"
+                ),
+                postings,
+            )
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('embeddings', sa.Column('token_count', sa.Integer(), nullable=True))
+    op.create_table('chunk_postings',
+    sa.Column('embedding_id', sa.Integer(), nullable=False),
+    sa.Column('term', sa.String(length=64), nullable=False),
+    sa.Column('case_id', sa.Integer(), nullable=False),
+    sa.Column('tf', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['case_id'], ['cases.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['embedding_id'], ['embeddings.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('embedding_id', 'term')
+    )
+    op.create_index('ix_chunk_postings_case_term', 'chunk_postings', ['case_id', 'term'], unique=False)
+
+    _backfill_postings(op.get_bind())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_chunk_postings_case_term', table_name='chunk_postings')
+    op.drop_table('chunk_postings')
+    op.drop_column('embeddings', 'token_count')
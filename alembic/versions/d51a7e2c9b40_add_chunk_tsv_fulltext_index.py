@@ -0,0 +1,39 @@
+"""add generated chunk_tsv column + gin index on embeddings
+
+Revision ID: d51a7e2c9b40
+Revises: b3d9f0e6c8a1
+Create Date: 2026-10-17 14:22:18.907551
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd51a7e2c9b40'
+down_revision: Union[str, Sequence[str], None] = 'b3d9f0e6c8a1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'embeddings',
+        sa.Column(
+            'chunk_tsv',
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('english', chunk_text)", persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index('ix_embeddings_chunk_tsv', 'embeddings', ['chunk_tsv'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_embeddings_chunk_tsv', table_name='embeddings', postgresql_using='gin')
+    op.drop_column('embeddings', 'chunk_tsv')
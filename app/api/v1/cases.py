@@ -18,6 +18,7 @@ from app.models.case import Case
 from sqlalchemy.orm import joinedload
 from app.schemas.file import ApprovalFileOut
 from app.services.file_service import FileService
+from app.services.ingestion_service import IngestionService
 
 router = APIRouter()
 
@@ -81,7 +82,7 @@ async def create_case(
     # create case synchronously (keeps your existing create_case behavior)
     case = svc.create_case_from_fields(case_name=case_name)
     
-    extracted_metadata = None
+    ingestion_job_id = None
 
     if file:
         # 1) save file and DB record (async)
@@ -94,43 +95,20 @@ async def create_case(
 
         file_id = file_upload_result["file_id"]
 
-        # 2) create embeddings and process file (async)
-        
-        file = (
-            db.query(CaseFile)
-            .filter(CaseFile.id == file_id)
-            .with_for_update()
-            .first()
-        )
+        # 2) approve and queue training; the ingestion worker embeds the file
+        #    and then extracts + merges case metadata
+        file = db.query(CaseFile).filter(CaseFile.id == file_id).first()
         file.status = FileStatus.APPROVED
         db.commit()
-        db.refresh(file)
-        processing_result = await hnd.process_file_embeddings_safe(file_id=file_id)
-        
-        if not processing_result.get("processed"):
-            # continue and return partial result; or raise if you need strict success
-            # we'll return partial result
-            extracted_metadata = None
-        else:
-            # 3) Run QA/AI to extract structured metadata from saved chunks/embeddings
-            try:
-                extracted_metadata = svc.qa_service.extract_case_metadata_for_file(file_id=file_id)
-            except Exception as e:
-                # log the error, return partial
-                extracted_metadata = None
-
-        # Build file_out to include in response
-    if extracted_metadata:
-        svc.qa_service.merge_case_metadata_for_case(
-            case.id,
-            extracted_metadata
-        )
+
+        ingestion_job_id = IngestionService(db).enqueue(file_id, extract_metadata=True).id
 
     return {
         "id": case.id,
         "case_name": case.case_name,
         "case_no": case.case_no,
         "created_at": case.created_at,
+        "ingestion_job_id": ingestion_job_id,
     }
 
 @router.get("/list-cases", response_model=PaginatedResponse[CaseListOut])
@@ -1,5 +1,6 @@
 # app/api/v1/chat.py
 from fastapi import APIRouter, Depends, Header
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.core.dependencies import get_db
@@ -12,6 +13,7 @@ from app.schemas.chat import (
 from app.services.chat_service import ChatService
 from app.core.dependencies import get_current_user
 from app.models.user import User
+from app.utils.sse import SSE_HEADERS
 
 router = APIRouter(tags=["Chat"])
 
@@ -42,14 +44,14 @@ def open_chat(
 
 
 @router.post("/message", response_model=ChatMessageResponse)
-def send_message(
+async def send_message(
     payload: ChatMessageRequest,
     caseid: int = Header(...),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
     ):
     service = ChatService(db)
-    answer = service.send_message(
+    answer = await service.send_message(
         case_id=caseid,
         user_id=current_user.id,
         session_id=payload.session_id,
@@ -59,3 +61,28 @@ def send_message(
         "answer": answer,
         "session_id": payload.session_id
     }
+
+
+@router.post("/message/stream")
+def stream_message(
+    payload: ChatMessageRequest,
+    caseid: int = Header(...),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Same as /message, but the answer arrives as Server-Sent Events:
+    "delta" frames with text, then one "done" frame with the full answer.
+    """
+    service = ChatService(db)
+    events = service.stream_message(
+        case_id=caseid,
+        user_id=current_user.id,
+        session_id=payload.session_id,
+        message=payload.message
+    )
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
@@ -8,8 +8,8 @@ from app.core.dependencies import get_db, require_role, get_current_user, requir
 from app.models.case_file import CaseFile, FileStatus
 from app.models.case import Case
 from app.services.file_service import FileService
-from app.schemas.file import FileUploadResponse
-from app.services.case_service import CaseService
+from app.services.ingestion_service import IngestionService
+from app.schemas.file import FileUploadResponse, IngestionJobOut
 from datetime import datetime
 router = APIRouter()
 
@@ -69,11 +69,10 @@ async def train_file(
         file.status = FileStatus.APPROVED
         db.commit()
 
-        case_svc = CaseService(db)
+        # embeddings + metadata extraction run in the ingestion worker
+        job = IngestionService(db).enqueue(file_id, extract_metadata=True)
 
-        result = await case_svc.process_file_and_extract_metadata(file_id)
-
-        return result
+        return {"message": "Training queued", "job_id": job.id, "status": job.status}
 
     # 👤 USER FLOW
     if file.status != FileStatus.DRAFT:
@@ -109,8 +108,38 @@ async def approve_file(
 
     db.commit()
 
-    # 🚀 IMPORTANT: service handles PROCESSING + PROCESSED
-    return await svc.process_file_embeddings_safe(file_id)
+    # 🚀 IMPORTANT: the ingestion worker handles PROCESSING + PROCESSED
+    job = IngestionService(db).enqueue(file_id)
+
+    return {"message": "Training queued", "job_id": job.id, "status": job.status}
+
+
+# -------------------------
+# TRAINING JOB STATUS
+# -------------------------
+@router.get("/jobs/{job_id}", response_model=IngestionJobOut)
+def get_ingestion_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user),
+):
+    job = IngestionService(db).get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    case = db.query(Case).filter(Case.id == job.file.case_id).first()
+
+    user_roles = [r.name for r in current_user.roles]
+
+    if (
+        "ADMIN" in user_roles
+        or "MASTER_ADMIN" in user_roles
+        or current_user in case.managers
+        or current_user in case.users
+    ):
+        return job
+
+    raise HTTPException(status_code=403, detail="Access denied")
 
 # -------------------------
 # VIEW FILE
@@ -1,20 +1,34 @@
 # app/api/v1/qa.py
+import logging
+
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.core.dependencies import get_db
+from app.db.session import SessionLocal
 from app.schemas.qa import QARequest, QAResponse, SpeechResponse
 from app.services.qa_service import QAService
 from app.core.global_case import global_case
+from app.core.vector_cache import vector_cache
+from app.core.embedding_cache import query_embedding_cache
+from app.core.answer_cache import answer_cache
+from app.core.metrics import metrics
+from app.core.openai_scheduler import schedulers
+from app.core.voice_prefetch import voice_prefetch
+from app.services.intent_classifier import intent_classifier
+from app.utils.sse import SSE_HEADERS, sse_event
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 @router.post("/ask", response_model=QAResponse)
-def ask_question(
+async def ask_question(
     payload: QARequest,
     db: Session = Depends(get_db),
 ):
     service = QAService(db)
-    result = service.answer_voice_question(
+    result = await service.answer_voice_question(
         case_id=payload.case_id,
         question=payload.question,
     )
@@ -26,6 +40,15 @@ def ask_question(
         )
     return result
 
+@router.post("/ask/stream")
+def ask_question_stream(payload: QARequest):
+    """
+    Streaming /ask: "delta" frames with answer text, then one "done" frame
+    carrying the full answer and its source chunks.
+    """
+    return _stream_voice_answer(payload.case_id, payload.question)
+
+
 @router.post("/speech-to-text", response_model=SpeechResponse)
 async def speech_to_text(file: UploadFile = File(...)
                          ,db: Session = Depends(get_db)):
@@ -38,7 +61,7 @@ async def speech_to_text(file: UploadFile = File(...)
     return result
 
 @router.post("/ask_voice")
-def ask(data: dict, db: Session = Depends(get_db)):
+async def ask(data: dict, db: Session = Depends(get_db)):
 
     case_id = global_case.case_id
     transcript_lines = data.get("transcript", [])
@@ -48,7 +71,7 @@ def ask(data: dict, db: Session = Depends(get_db)):
     
     service = QAService(db)
 
-    result = service.answer_voice_question(
+    result = await service.answer_voice_question(
         case_id=case_id,
         question=transcript
     )
@@ -65,3 +88,74 @@ def ask(data: dict, db: Session = Depends(get_db)):
         "answer": str(result.get("answer", "")),
         "source_chunks": str(result.get("source_chunks", ""))
     }
+
+
+@router.post("/ask_voice/delta")
+async def ask_voice_delta(data: dict, db: Session = Depends(get_db)):
+    """
+    New transcript lines of the live meeting ({"transcript": [...]}).
+    Prepares the answer to the latest candidate question, so a following
+    /ask_voice for it only waits for the completion. {"reset": true} starts
+    a new transcript.
+    """
+    case_id = global_case.case_id
+    if data.get("reset"):
+        voice_prefetch.reset(case_id)
+
+    service = QAService(db)
+    return await service.prefetch_voice_answer(
+        case_id=case_id,
+        lines=data.get("transcript", [])
+    )
+
+
+@router.post("/ask_voice/stream")
+def ask_stream(data: dict):
+    transcript = "\n".join(data.get("transcript", []))
+    return _stream_voice_answer(global_case.case_id, transcript)
+
+
+def _stream_voice_answer(case_id: int, question: str) -> StreamingResponse:
+    async def events():
+        # own session: the body is produced after the request scope has ended
+        db = SessionLocal()
+        try:
+            service = QAService(db)
+            async for event, payload in service.stream_voice_answer(
+                case_id=case_id,
+                question=question
+            ):
+                if event == "delta":
+                    yield sse_event("delta", {"text": payload})
+                else:
+                    yield sse_event("done", payload)
+        except Exception:
+            logger.exception("Voice answer stream failed for case %s", case_id)
+            yield sse_event("error", {"detail": "Failed to generate an answer"})
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+
+@router.get("/cache-stats")
+def cache_stats():
+    return {
+        "vector_cache": vector_cache.stats(),
+        "query_embedding_cache": query_embedding_cache.stats(),
+        "answer_cache": answer_cache.stats(),
+        "voice_prefetch": voice_prefetch.stats(),
+    }
+
+
+@router.get("/metrics")
+def answer_metrics():
+    return {
+        **metrics.snapshot(),
+        "intent_classifier": intent_classifier.stats(),
+        "openai_schedulers": {name: s.stats() for name, s in schedulers.items()},
+    }
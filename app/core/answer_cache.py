@@ -0,0 +1,113 @@
+# app/core/answer_cache.py
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.vector_cache import normalize_rows
+
+
+class _CaseAnswers:
+    def __init__(self, dim: int):
+        self.vectors = np.zeros((0, dim), dtype=np.float32)
+        self.results = []
+        self.created = []
+
+
+class SemanticAnswerCache:
+    """
+    Per-case cache of RAG answers, matched on question-embedding similarity.
+
+    An entry is served when the cosine similarity between the new question and a
+    cached question of the same case reaches `threshold`. All entries of a case are
+    dropped when its set of trained files changes.
+    """
+
+    def __init__(self, threshold: float, max_entries_per_case: int, max_cases: int, ttl_seconds: int):
+        self.threshold = threshold
+        self.max_entries_per_case = max_entries_per_case
+        self.max_cases = max_cases
+        self.ttl_seconds = ttl_seconds
+        self._cases: "OrderedDict[int, _CaseAnswers]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def lookup(self, case_id: int, question_vector: Sequence[float]) -> Optional[Dict[str, Any]]:
+        q = normalize_rows(question_vector)[0]
+
+        with self._lock:
+            entry = self._cases.get(case_id)
+            if entry is None or not entry.results or entry.vectors.shape[1] != q.shape[0]:
+                self.misses += 1
+                return None
+
+            sims = entry.vectors @ q
+            best = int(np.argmax(sims))
+            fresh = (time.monotonic() - entry.created[best]) <= self.ttl_seconds
+
+            if sims[best] < self.threshold or not fresh:
+                self.misses += 1
+                return None
+
+            self._cases.move_to_end(case_id)
+            self.hits += 1
+            return copy.deepcopy(entry.results[best])
+
+    def store(self, case_id: int, question_vector: Sequence[float], result: Dict[str, Any]):
+        q = normalize_rows(question_vector)
+
+        with self._lock:
+            entry = self._cases.get(case_id)
+            if entry is None or entry.vectors.shape[1] != q.shape[1]:
+                entry = _CaseAnswers(q.shape[1])
+                self._cases[case_id] = entry
+
+            entry.vectors = np.vstack([entry.vectors, q])
+            entry.results.append(copy.deepcopy(result))
+            entry.created.append(time.monotonic())
+
+            overflow = len(entry.results) - self.max_entries_per_case
+            if overflow > 0:
+                entry.vectors = entry.vectors[overflow:]
+                entry.results = entry.results[overflow:]
+                entry.created = entry.created[overflow:]
+
+            self._cases.move_to_end(case_id)
+            while len(self._cases) > self.max_cases:
+                self._cases.popitem(last=False)
+
+    def invalidate(self, case_id: int):
+        with self._lock:
+            if self._cases.pop(case_id, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._cases.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "cases": len(self._cases),
+                "entries": sum(len(e.results) for e in self._cases.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+            }
+
+
+answer_cache = SemanticAnswerCache(
+    threshold=settings.ANSWER_CACHE_SIMILARITY_THRESHOLD,
+    max_entries_per_case=settings.ANSWER_CACHE_MAX_ENTRIES_PER_CASE,
+    max_cases=settings.ANSWER_CACHE_MAX_CASES,
+    ttl_seconds=settings.ANSWER_CACHE_TTL_SECONDS,
+)
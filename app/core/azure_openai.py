@@ -1,10 +1,21 @@
 # app/core/azure_openai.py
 
-from openai import AzureOpenAI
+from openai import AzureOpenAI, AsyncAzureOpenAI
 from app.core.config import settings
+from app.core.instrumented_openai import AsyncInstrumentedOpenAI, InstrumentedOpenAI
 
-client = AzureOpenAI(
+# retries are done (and counted) by the instrumented wrappers, not the SDK
+client = InstrumentedOpenAI(AzureOpenAI(
     api_key=settings.AZURE_OPENAI_API_KEY,
     api_version=settings.AZURE_OPENAI_API_VERSION,
-    azure_endpoint=settings.AZURE_OPENAI_ENDPOINT
-)
\ No newline at end of file
+    azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
+    max_retries=0
+))
+
+# request path (chat / voice): awaits on the event loop instead of pinning a threadpool worker
+async_client = AsyncInstrumentedOpenAI(AsyncAzureOpenAI(
+    api_key=settings.AZURE_OPENAI_API_KEY,
+    api_version=settings.AZURE_OPENAI_API_VERSION,
+    azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
+    max_retries=0
+))
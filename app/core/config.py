@@ -25,6 +25,11 @@ class Settings(BaseSettings):
     UPLOAD_DIR: str = str(BASE_DIR / "uploads")
 
     MAX_UPLOAD_SIZE_BYTES: int = 25 * 1024 * 1024  # fallback
+    UPLOAD_CHUNK_SIZE_BYTES: int = 1024 * 1024  # uploads are copied to disk in chunks of this size
+    # PDFs with at least this many pages are extracted in page slices across
+    # PDF_EXTRACT_PROCESSES processes (0 = one per CPU); smaller ones in-process
+    PDF_PARALLEL_MIN_PAGES: int = 200
+    PDF_EXTRACT_PROCESSES: int = 0
     ALLOWED_UPLOAD_TYPES: str = "application/pdf"
 
     # ===============================
@@ -41,12 +46,107 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: Optional[str] = None
     OPENAI_MODEL: str = "gpt-4o-mini"
     EMBEDDING_MODEL: str = "text-embedding-3-small"
+    EMBEDDING_DIMENSIONS: int = 1536
+    # "pgvector" | "float32" (bytea) | "int8" (bytea + per-vector scale)
+    # compact modes are scored in-process, i.e. they imply VECTOR_SEARCH_BACKEND=memory
+    # existing rows keep their format after a change: run python -m app.reencode_embeddings
+    EMBEDDING_STORAGE_MODE: str = "pgvector"
     
     AZURE_OPENAI_API_KEY: Optional[str] = None
     AZURE_OPENAI_ENDPOINT: Optional[str] = None
     AZURE_OPENAI_API_VERSION: str = "2024-02-01"
     AZURE_OPENAI_EMBEDDING_DEPLOYMENT: Optional[str] = None
     AZURE_OPENAI_CHAT_DEPLOYMENT: Optional[str] = None
+    LLM_MAX_RETRIES: int = 2  # transient errors (429, 5xx, timeouts) per call
+    LLM_RETRY_BASE_SECONDS: float = 0.5  # backoff when the server sends no Retry-After
+    # outbound quota per deployment, across all processes (match the Azure deployment's limits)
+    LLM_CHAT_REQUESTS_PER_MINUTE: int = 720
+    LLM_CHAT_TOKENS_PER_MINUTE: int = 120000
+    LLM_EMBEDDING_REQUESTS_PER_MINUTE: int = 720
+    LLM_EMBEDDING_TOKENS_PER_MINUTE: int = 240000
+    LLM_MAX_CONCURRENCY: int = 32  # in-flight calls per deployment
+    LLM_BACKGROUND_MAX_CONCURRENCY: int = 8  # of which ingestion / extraction / MOM may use
+    # processes calling the deployments: API workers + ingestion worker processes.
+    # The scheduler is per process (no cross-process coordination), so each one enforces
+    # 1/LLM_QUOTA_PROCESSES of the limits above; interactive calls only hold back
+    # background calls in their own process.
+    LLM_QUOTA_PROCESSES: int = 1
+    # document chunks are embedded in batches, several batches in flight at once
+    EMBEDDING_BATCH_SIZE: int = 64  # inputs per embeddings request
+    EMBEDDING_BATCH_MAX_TOKENS: int = 32000  # estimated input tokens per request
+    EMBEDDING_CONCURRENCY: int = 4  # batches in flight per file
+    # chunk sizing for trained files: default | precise | broad (app/utils/text_chunker.py)
+    CHUNK_PROFILE: str = "default"
+
+    # ===============================
+    # INGESTION WORKER (python -m app.worker)
+    # ===============================
+    INGESTION_WORKER_PROCESSES: int = 2
+    INGESTION_POLL_SECONDS: float = 2.0  # idle wait between claim attempts
+    INGESTION_LEASE_SECONDS: int = 300  # a job whose lease lapses is claimed again
+    INGESTION_HEARTBEAT_SECONDS: int = 30  # lease renewal + progress flush
+    INGESTION_MAX_ATTEMPTS: int = 3
+    # chunk rows are committed in groups of this size while a file streams through
+    INGESTION_COMMIT_EVERY_CHUNKS: int = 512
+    # API processes drop their vector/answer caches for cases trained by the worker
+    INGESTION_CACHE_SYNC_SECONDS: int = 5
+
+    # ===============================
+    # RETRIEVAL
+    # ===============================
+    # "pgvector" -> ORDER BY vector <=> :q LIMIT k in Postgres (HNSW index)
+    # "memory"   -> score against the in-process per-case vector cache
+    VECTOR_SEARCH_BACKEND: str = "pgvector"
+    VECTOR_CACHE_MAX_BYTES: int = 512 * 1024 * 1024  # per process
+    # "hybrid" -> vector top-k re-ranked with BM25 (chunk_postings)
+    # "rrf"    -> one SQL query fusing pgvector and ts_rank ranks (reciprocal-rank fusion)
+    RAG_RETRIEVAL_MODE: str = "hybrid"
+    RAG_RRF_K: int = 60
+    RAG_CANDIDATE_POOL: int = 20  # nearest chunks re-ranked with BM25 scores
+    RAG_LEXICAL_WEIGHT: float = 0.15  # weight of the max-scaled BM25 score
+    PGVECTOR_HNSW_EF_SEARCH: int = 100
+    # the HNSW scan returns ~ef_search rows *before* the case filter, so a small case in a
+    # large table can come back short. pgvector >= 0.8 keeps scanning until the filter is
+    # satisfied ("relaxed_order" | "strict_order" | "off"); short results (older pgvector,
+    # or hnsw.max_scan_tuples reached) are redone as an exact scan over the case's rows
+    PGVECTOR_ITERATIVE_SCAN: str = "relaxed_order"
+    # RAG prompt = system + history + ranked chunks + question, packed to this many
+    # tokens; lower-ranked chunks are trimmed/dropped first
+    RAG_PROMPT_TOKEN_BUDGET: int = 3000
+    RAG_MIN_CHUNK_TOKENS: int = 64  # don't send trimmed chunks shorter than this
+    TOKENIZER_ENCODING: str = "o200k_base"  # tiktoken encoding (gpt-4o family)
+
+    QUERY_EMBEDDING_CACHE_SIZE: int = 4096  # in-memory entries per process
+    QUERY_EMBEDDING_CACHE_PERSIST: bool = False  # also keep query vectors in Postgres
+    # document chunks: chunk text hash -> vector in Postgres (embedding_cache table),
+    # so retrained / overlapping files only embed chunks never seen before
+    CHUNK_EMBEDDING_CACHE_ENABLED: bool = True
+
+    ANSWER_CACHE_ENABLED: bool = True  # history-free (voice) RAG answers only
+    ANSWER_CACHE_SIMILARITY_THRESHOLD: float = 0.95  # cosine, question vs cached question
+    ANSWER_CACHE_MAX_ENTRIES_PER_CASE: int = 256
+    ANSWER_CACHE_MAX_CASES: int = 1000
+    ANSWER_CACHE_TTL_SECONDS: int = 24 * 60 * 60
+
+    # local chat intent classifier (rules + nearest centroid); the LLM is
+    # only asked when it is not confident. Similarities depend on the
+    # embedding model, so tune both thresholds per deployment.
+    INTENT_CLASSIFIER_ENABLED: bool = True
+    INTENT_MIN_SIMILARITY: float = 0.50  # cosine, question vs best intent centroid
+    INTENT_MIN_MARGIN: float = 0.05  # best minus runner-up centroid similarity
+
+    # speculative voice answers: refine + retrieval for the latest candidate
+    # question of a live transcript (POST /qa/ask_voice/delta)
+    VOICE_PREFETCH_ENABLED: bool = True
+    VOICE_PREFETCH_TTL_SECONDS: int = 120
+    VOICE_TRANSCRIPT_MAX_LINES: int = 200
+
+    # chat history sent to the model: the session summary plus the most recent
+    # turns verbatim, within a token budget; older turns are summarized
+    CHAT_HISTORY_MAX_TURNS: int = 6  # user+assistant pairs kept verbatim
+    CHAT_HISTORY_TOKEN_BUDGET: int = 1500  # summary + verbatim turns
+    CHAT_SUMMARY_MAX_TOKENS: int = 300
+    CHAT_SUMMARY_MIN_MESSAGES: int = 6  # fold older messages in batches of at least this many
 
     # ===============================
     # OPTIONAL STORAGE (AWS / Azure later)
@@ -0,0 +1,355 @@
+# app/core/embedding_cache.py
+import asyncio
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.session import SessionLocal
+from app.models.embedding_cache import EmbeddingCacheEntry
+
+logger = logging.getLogger(__name__)
+
+_WS_RE = re.compile(r"\s+")
+
+
+def normalize_query_text(text: str) -> str:
+    """
+    Questions that differ only in case, spacing or trailing punctuation share a vector.
+    """
+    return _WS_RE.sub(" ", (text or "").strip().lower()).rstrip(" ?.!")
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def chunk_hash(text: str) -> str:
+    # exact text, and namespaced: query keys are normalized, so the same string
+    # may map to a different vector there
+    return text_hash("chunk\0" + text)
+
+
+class QueryEmbeddingCache:
+    """
+    Two-tier cache for query embeddings:
+    - in-memory LRU (per process)
+    - optional Postgres table `embedding_cache` shared by all processes
+    """
+
+    def __init__(self, max_entries: int, persist: bool = False):
+        self.max_entries = max_entries
+        self.persist = persist
+        self._entries: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        # concurrent async misses for the same text share one request
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def get_or_create(
+        self,
+        deployment: str,
+        text: str,
+        create: Callable[[str], Sequence[float]],
+    ) -> np.ndarray:
+        key = (deployment or "", normalize_query_text(text))
+
+        vector = self._lookup_memory(key)
+        if vector is not None:
+            return vector
+
+        vector = self._lookup_persisted(key)
+        if vector is None:
+            vector = np.asarray(create(text), dtype=np.float32)
+            self._count_miss()
+            if self.persist:
+                self._store_persisted(key, vector)
+
+        self._remember(key, vector)
+        return vector
+
+    async def get_or_create_async(
+        self,
+        deployment: str,
+        text: str,
+        create: Callable[[str], Awaitable[Sequence[float]]],
+    ) -> np.ndarray:
+        key = (deployment or "", normalize_query_text(text))
+
+        vector = self._lookup_memory(key)
+        if vector is not None:
+            return vector
+
+        pending = self._inflight.get(key)
+        if pending is None or pending.get_loop() is not asyncio.get_running_loop():
+            pending = asyncio.ensure_future(self._create_async(key, text, create))
+            self._inflight[key] = pending
+            pending.add_done_callback(lambda f: self._forget_inflight(key, f))
+
+        # shield: a cancelled caller must not cancel the request other callers wait on
+        return await asyncio.shield(pending)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.memory_hits + self.db_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "memory_hits": self.memory_hits,
+                "db_hits": self.db_hits,
+                "misses": self.misses,
+                "hit_ratio": ((self.memory_hits + self.db_hits) / lookups) if lookups else 0.0,
+            }
+
+    # -------------------------
+    # Internals
+    # -------------------------
+    async def _create_async(
+        self,
+        key: Tuple[str, str],
+        text: str,
+        create: Callable[[str], Awaitable[Sequence[float]]],
+    ) -> np.ndarray:
+        vector = await asyncio.to_thread(self._lookup_persisted, key)
+        if vector is None:
+            vector = np.asarray(await create(text), dtype=np.float32)
+            self._count_miss()
+            if self.persist:
+                await asyncio.to_thread(self._store_persisted, key, vector)
+
+        self._remember(key, vector)
+        return vector
+
+    def _forget_inflight(self, key, future: asyncio.Future):
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+
+    def _lookup_memory(self, key) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+            return vector
+
+    def _lookup_persisted(self, key) -> Optional[np.ndarray]:
+        if not self.persist:
+            return None
+        vector = self._load_persisted(key)
+        if vector is not None:
+            with self._lock:
+                self.db_hits += 1
+        return vector
+
+    def _count_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def _remember(self, key, vector: np.ndarray):
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _load_persisted(self, key) -> Optional[np.ndarray]:
+        db = SessionLocal()
+        try:
+            row = db.get(EmbeddingCacheEntry, (key[0], text_hash(key[1])))
+            if row is None:
+                return None
+            return np.frombuffer(row.vector, dtype="<f4").astype(np.float32)
+        except Exception:
+            logger.exception("Embedding cache lookup failed")
+            return None
+        finally:
+            db.close()
+
+    def _store_persisted(self, key, vector: np.ndarray):
+        db = SessionLocal()
+        try:
+            db.execute(
+                insert(EmbeddingCacheEntry)
+                .values(
+                    deployment=key[0],
+                    text_hash=text_hash(key[1]),
+                    vector=vector.astype("<f4").tobytes(),
+                )
+                .on_conflict_do_nothing()
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception("Embedding cache write failed")
+        finally:
+            db.close()
+
+
+class ChunkEmbeddingCache:
+    """
+    Persistent chunk text -> vector cache for document training, stored in the
+    `embedding_cache` table and scoped by embedding deployment.
+
+    Identical chunks requested concurrently (within this process) are
+    embedded once: the first caller owns them, the others wait for its result.
+    """
+
+    # rows per SELECT ... WHERE text_hash IN (...)
+    LOOKUP_BATCH = 1000
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._inflight: Dict[Tuple[str, str], Future] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.inflight_waits = 0
+
+    def get_or_create_many(
+        self,
+        deployment: str,
+        texts: Sequence[str],
+        create_many: Callable[[List[str]], Sequence[Sequence[float]]],
+    ) -> List[np.ndarray]:
+        """
+        One vector per text, in order. `create_many` is called at most once,
+        with the distinct texts that are neither stored nor being embedded by
+        another caller.
+        """
+        deployment = deployment or ""
+        keys = [chunk_hash(t) for t in texts]
+        unique = dict(zip(keys, texts))
+
+        vectors = self._load_many(deployment, list(unique))
+        missing = [h for h in unique if h not in vectors]
+
+        owned: Dict[str, Future] = {}
+        waiting: Dict[str, Future] = {}
+        with self._lock:
+            for h in missing:
+                pending = self._inflight.get((deployment, h))
+                if pending is None:
+                    pending = owned[h] = self._inflight[(deployment, h)] = Future()
+                else:
+                    waiting[h] = pending
+            self.hits += len(unique) - len(missing)
+            self.misses += len(owned)
+            self.inflight_waits += len(waiting)
+
+        metrics.increment("chunk_embedding_cache_hits_total", len(unique) - len(missing))
+        metrics.increment("chunk_embedding_cache_misses_total", len(owned))
+        logger.debug(
+            "chunk embedding cache: %d distinct chunks, %d cached, %d in flight elsewhere, %d to embed",
+            len(unique), len(unique) - len(missing), len(waiting), len(owned),
+        )
+
+        if owned:
+            try:
+                created = create_many([unique[h] for h in owned])
+                fresh = {h: np.asarray(v, dtype=np.float32) for h, v in zip(owned, created)}
+                self._store_many(deployment, fresh)
+            except BaseException as e:
+                for h, future in owned.items():
+                    future.set_exception(e)
+                raise
+            else:
+                for h, future in owned.items():
+                    future.set_result(fresh[h])
+                vectors.update(fresh)
+            finally:
+                with self._lock:
+                    for h in owned:
+                        self._inflight.pop((deployment, h), None)
+
+        for h, future in waiting.items():
+            vectors[h] = future.result()
+
+        return [vectors[h] for h in keys]
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses + self.inflight_waits
+            return {
+                "enabled": self.enabled,
+                "hits": self.hits,
+                "misses": self.misses,
+                "inflight_waits": self.inflight_waits,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+            }
+
+    # -------------------------
+    # Internals
+    # -------------------------
+    def _load_many(self, deployment: str, hashes: List[str]) -> Dict[str, np.ndarray]:
+        found: Dict[str, np.ndarray] = {}
+        if not hashes:
+            return found
+
+        db = SessionLocal()
+        try:
+            for start in range(0, len(hashes), self.LOOKUP_BATCH):
+                rows = (
+                    db.query(EmbeddingCacheEntry.text_hash, EmbeddingCacheEntry.vector)
+                    .filter(
+                        EmbeddingCacheEntry.deployment == deployment,
+                        EmbeddingCacheEntry.text_hash.in_(hashes[start:start + self.LOOKUP_BATCH]),
+                    )
+                    .all()
+                )
+                for h, blob in rows:
+                    found[h] = np.frombuffer(blob, dtype="<f4").astype(np.float32)
+        except Exception:
+            # a broken cache must not stop training; everything counts as a miss
+            logger.exception("Chunk embedding cache lookup failed")
+            return {}
+        finally:
+            db.close()
+        return found
+
+    def _store_many(self, deployment: str, vectors: Dict[str, np.ndarray]):
+        if not vectors:
+            return
+
+        rows = [
+            {"deployment": deployment, "text_hash": h, "vector": v.astype("<f4").tobytes()}
+            for h, v in vectors.items()
+        ]
+
+        db = SessionLocal()
+        try:
+            for start in range(0, len(rows), self.LOOKUP_BATCH):
+                db.execute(
+                    insert(EmbeddingCacheEntry)
+                    .values(rows[start:start + self.LOOKUP_BATCH])
+                    .on_conflict_do_nothing()
+                )
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception("Chunk embedding cache write failed")
+        finally:
+            db.close()
+
+
+query_embedding_cache = QueryEmbeddingCache(
+    max_entries=settings.QUERY_EMBEDDING_CACHE_SIZE,
+    persist=settings.QUERY_EMBEDDING_CACHE_PERSIST,
+)
+
+chunk_embedding_cache = ChunkEmbeddingCache(enabled=settings.CHUNK_EMBEDDING_CACHE_ENABLED)
@@ -0,0 +1,250 @@
+# app/core/instrumented_openai.py
+"""
+Timing, token and retry accounting around the shared Azure OpenAI clients.
+
+`client.chat.completions.create(...)` and `client.embeddings.create(...)` take
+one extra keyword, `call_site`, used as a metrics label (classify, rag_answer,
+metadata_extract, ...) and to pick the scheduler lane: every attempt is first
+admitted by app.core.openai_scheduler. Retries of transient failures happen
+here instead of inside the SDK, so every retry is counted; a 429 pauses the
+whole deployment for its Retry-After.
+
+Metrics (app.core.metrics, labels kind=chat|embeddings and call_site):
+- llm_request_seconds          latency of successful calls (streams: until the last chunk)
+- llm_requests_total           per outcome=ok|error
+- llm_prompt_tokens_total / llm_completion_tokens_total
+- llm_retries_total
+- llm_errors_total             per error class
+- llm_queue_seconds / llm_throttled_total (app.core.openai_scheduler)
+"""
+import asyncio
+import logging
+import random
+import time
+from types import SimpleNamespace
+
+import openai
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.openai_scheduler import lane_for, schedulers
+from app.utils.tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+def retry_delay(attempt: int, error: Exception) -> float:
+    """
+    Seconds to wait before retry `attempt` (1-based): the server's Retry-After
+    when it sent one, else exponential backoff with jitter.
+    """
+    response = getattr(error, "response", None)
+    if response is not None:
+        header = response.headers.get("retry-after")
+        try:
+            if header is not None:
+                return max(0.0, float(header))
+        except ValueError:
+            pass
+
+    base = settings.LLM_RETRY_BASE_SECONDS * (2 ** (attempt - 1))
+    return base + random.uniform(0, base)
+
+
+def estimate_tokens(kind: str, kwargs) -> int:
+    """
+    Tokens a call counts against the TPM quota: its input plus max output.
+    """
+    if kind == "embeddings":
+        inputs = kwargs.get("input")
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        return sum(count_tokens(t) for t in inputs or [] if isinstance(t, str))
+
+    prompt = sum(
+        count_tokens(m.get("content"))
+        for m in kwargs.get("messages") or []
+        if isinstance(m.get("content"), str)
+    )
+    return prompt + (kwargs.get("max_tokens") or 512)
+
+
+class InstrumentedOpenAI:
+    """
+    Wraps a sync AzureOpenAI client; anything besides chat completions and
+    embeddings is passed through untouched.
+    """
+
+    def __init__(self, inner):
+        self._inner = inner
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._chat_create))
+        self.embeddings = SimpleNamespace(create=self._embeddings_create)
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+    def _chat_create(self, *, call_site: str = "unlabeled", **kwargs):
+        return self._call("chat", call_site, self._inner.chat.completions.create, kwargs)
+
+    def _embeddings_create(self, *, call_site: str = "unlabeled", **kwargs):
+        return self._call("embeddings", call_site, self._inner.embeddings.create, kwargs)
+
+    def _call(self, kind: str, call_site: str, create, kwargs):
+        scheduler = schedulers[kind]
+        lane = lane_for(call_site)
+        tokens = estimate_tokens(kind, kwargs)
+        attempt = 0
+        if kwargs.get("stream"):
+            # otherwise a stream never reports the tokens it used
+            kwargs.setdefault("stream_options", {"include_usage": True})
+
+        while True:
+            scheduler.acquire(lane, tokens)
+            started = time.perf_counter()
+            try:
+                response = create(**kwargs)
+                break
+            except RETRYABLE_ERRORS as e:
+                if attempt >= settings.LLM_MAX_RETRIES:
+                    _record_error(kind, call_site, e)
+                    raise
+                attempt += 1
+                metrics.increment("llm_retries_total", kind=kind, call_site=call_site)
+                if isinstance(e, openai.RateLimitError):
+                    # everyone waits: the next acquire() blocks until the pause is over
+                    scheduler.backoff(retry_delay(attempt, e))
+                else:
+                    time.sleep(retry_delay(attempt, e))
+            except Exception as e:
+                _record_error(kind, call_site, e)
+                raise
+            finally:
+                # a stream gives its slot back once the response has started
+                scheduler.release()
+
+        if kwargs.get("stream"):
+            return _SyncStream(response, kind, call_site, started)
+
+        _record_success(kind, call_site, started, getattr(response, "usage", None))
+        return response
+
+
+class AsyncInstrumentedOpenAI:
+    """
+    Async counterpart of InstrumentedOpenAI, for AsyncAzureOpenAI.
+    """
+
+    def __init__(self, inner):
+        self._inner = inner
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._chat_create))
+        self.embeddings = SimpleNamespace(create=self._embeddings_create)
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+    async def _chat_create(self, *, call_site: str = "unlabeled", **kwargs):
+        return await self._call("chat", call_site, self._inner.chat.completions.create, kwargs)
+
+    async def _embeddings_create(self, *, call_site: str = "unlabeled", **kwargs):
+        return await self._call("embeddings", call_site, self._inner.embeddings.create, kwargs)
+
+    async def _call(self, kind: str, call_site: str, create, kwargs):
+        scheduler = schedulers[kind]
+        lane = lane_for(call_site)
+        tokens = estimate_tokens(kind, kwargs)
+        attempt = 0
+        if kwargs.get("stream"):
+            # otherwise a stream never reports the tokens it used
+            kwargs.setdefault("stream_options", {"include_usage": True})
+
+        while True:
+            await scheduler.acquire_async(lane, tokens)
+            started = time.perf_counter()
+            try:
+                response = await create(**kwargs)
+                break
+            except RETRYABLE_ERRORS as e:
+                if attempt >= settings.LLM_MAX_RETRIES:
+                    _record_error(kind, call_site, e)
+                    raise
+                attempt += 1
+                metrics.increment("llm_retries_total", kind=kind, call_site=call_site)
+                if isinstance(e, openai.RateLimitError):
+                    scheduler.backoff(retry_delay(attempt, e))
+                else:
+                    await asyncio.sleep(retry_delay(attempt, e))
+            except Exception as e:
+                _record_error(kind, call_site, e)
+                raise
+            finally:
+                scheduler.release()
+
+        if kwargs.get("stream"):
+            return _AsyncStream(response, kind, call_site, started)
+
+        _record_success(kind, call_site, started, getattr(response, "usage", None))
+        return response
+
+
+class _SyncStream:
+    def __init__(self, stream, kind: str, call_site: str, started: float):
+        self._stream = stream
+        self._labels = (kind, call_site)
+        self._started = started
+
+    def __iter__(self):
+        usage = None
+        try:
+            for chunk in self._stream:
+                usage = getattr(chunk, "usage", None) or usage
+                yield chunk
+        except Exception as e:
+            _record_error(*self._labels, e)
+            raise
+        _record_success(*self._labels, self._started, usage)
+
+
+class _AsyncStream:
+    def __init__(self, stream, kind: str, call_site: str, started: float):
+        self._stream = stream
+        self._labels = (kind, call_site)
+        self._started = started
+
+    async def __aiter__(self):
+        usage = None
+        try:
+            async for chunk in self._stream:
+                # usage arrives on a final, choice-less chunk
+                usage = getattr(chunk, "usage", None) or usage
+                yield chunk
+        except Exception as e:
+            _record_error(*self._labels, e)
+            raise
+        _record_success(*self._labels, self._started, usage)
+
+
+def _record_success(kind: str, call_site: str, started: float, usage):
+    metrics.observe("llm_request_seconds", time.perf_counter() - started, kind=kind, call_site=call_site)
+    metrics.increment("llm_requests_total", kind=kind, call_site=call_site, outcome="ok")
+
+    if usage is None:
+        return
+
+    # embeddings report prompt tokens only
+    for field in ("prompt_tokens", "completion_tokens"):
+        tokens = getattr(usage, field, None)
+        if tokens is not None:
+            metrics.increment(f"llm_{field}_total", tokens, kind=kind, call_site=call_site)
+
+
+def _record_error(kind: str, call_site: str, error: Exception):
+    metrics.increment("llm_requests_total", kind=kind, call_site=call_site, outcome="error")
+    metrics.increment("llm_errors_total", kind=kind, call_site=call_site, error=type(error).__name__)
+    logger.warning("%s call %s failed: %s", kind, call_site, error)
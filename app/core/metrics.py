@@ -0,0 +1,128 @@
+# app/core/metrics.py
+import threading
+from collections import deque
+from typing import Dict, Tuple
+
+import numpy as np
+
+
+class Histogram:
+    """
+    Count/sum of every observation plus a rolling window of the latest samples
+    for percentiles.
+    """
+
+    def __init__(self, window: int = 2048):
+        self.count = 0
+        self.total = 0.0
+        self._samples = deque(maxlen=window)
+
+    def observe(self, value: float):
+        self.count += 1
+        self.total += value
+        self._samples.append(value)
+
+    def snapshot(self) -> Dict[str, float]:
+        if not self._samples:
+            return {"count": self.count, "sum": self.total}
+
+        p50, p95, p99 = np.percentile(np.fromiter(self._samples, dtype=np.float64), [50, 95, 99])
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "avg": self.total / self.count,
+            "p50": float(p50),
+            "p95": float(p95),
+            "p99": float(p99),
+        }
+
+
+class MetricsRegistry:
+    """
+    Process-level histograms and counters, keyed by name + labels.
+    """
+
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Histogram] = {}
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, **labels: str):
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(float(value))
+
+    def increment(self, name: str, amount: float = 1, **labels: str):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def snapshot(self) -> Dict[str, list]:
+        with self._lock:
+            return {
+                "histograms": [
+                    {"name": name, "labels": dict(labels), **histogram.snapshot()}
+                    for (name, labels), histogram in sorted(self._histograms.items())
+                ],
+                "counters": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(self._counters.items())
+                ],
+            }
+
+    def render_prometheus(self) -> str:
+        """
+        Text exposition format: histograms as summaries (p50/p95/p99 over the
+        recent window, _sum and _count over the process lifetime).
+        """
+        lines = []
+
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+
+            typed = set()
+            for (name, labels), histogram in histograms:
+                if name not in typed:
+                    lines.append(f"# TYPE {name} summary")
+                    typed.add(name)
+                snap = histogram.snapshot()
+                for q in ("p50", "p95", "p99"):
+                    if q in snap:
+                        quantile = f"0.{q[1:]}"
+                        lines.append(f"{name}{_render_labels(labels + (('quantile', quantile),))} {snap[q]}")
+                lines.append(f"{name}_sum{_render_labels(labels)} {snap['sum']}")
+                lines.append(f"{name}_count{_render_labels(labels)} {snap['count']}")
+
+            for (name, labels), value in counters:
+                if name not in typed:
+                    lines.append(f"# TYPE {name} counter")
+                    typed.add(name)
+                lines.append(f"{name}{_render_labels(labels)} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+def _label_key(labels: Dict[str, str]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _render_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in labels
+    )
+    return "{" + body + "}"
+
+
+metrics = MetricsRegistry()
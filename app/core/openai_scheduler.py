@@ -0,0 +1,225 @@
+# app/core/openai_scheduler.py
+"""
+Admission control for outbound Azure OpenAI calls, shared by every caller in
+the process (request handlers, ingestion threads, cron jobs).
+
+Per deployment kind (chat, embeddings) a call needs:
+- a free concurrency slot (background calls get fewer slots than interactive ones)
+- one request from the requests-per-minute bucket
+- its estimated tokens from the tokens-per-minute bucket
+Buckets hold 10 seconds' worth of quota, so bursts stay below Azure's
+short-window limits. An interactive call that is waiting blocks background
+admissions, and a 429 pauses every lane until its Retry-After has passed.
+
+State is per process: the configured limits are per deployment, so each
+process takes a 1/LLM_QUOTA_PROCESSES share of them (see _share).
+"""
+import asyncio
+import threading
+import time
+from typing import Dict
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+# call sites on a user's critical path; everything else is background
+INTERACTIVE_CALL_SITES = {
+    "classify",
+    "voice_refine",
+    "rag_answer",
+    "chat_greeting",
+    "chat_memory",
+    "chat_follow_up",
+    "voice_greeting",
+    "voice_general",
+    "embed_query",
+}
+
+# how long a waiter sleeps before re-checking when nothing tells it exactly
+_POLL_SECONDS = 0.05
+
+
+def lane_for(call_site: str) -> str:
+    return INTERACTIVE if call_site in INTERACTIVE_CALL_SITES else BACKGROUND
+
+
+class _Bucket:
+    def __init__(self, per_minute: float, burst_seconds: float = 10.0):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_for(self, amount: float) -> float:
+        """
+        Seconds until `amount` is available (0 when it already is). A call
+        bigger than the bucket only waits for a full bucket; it is then charged
+        in full and the level goes negative, so the calls after it wait off
+        the excess.
+        """
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate if self.rate > 0 else _POLL_SECONDS
+
+
+class OpenAIScheduler:
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_concurrency: int,
+        background_max_concurrency: int,
+    ):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.background_max_concurrency = min(background_max_concurrency, max_concurrency)
+        self._requests = _Bucket(requests_per_minute)
+        self._tokens = _Bucket(tokens_per_minute)
+        self._cond = threading.Condition()
+
+        self._in_flight = 0
+        self._interactive_waiting = 0
+        self._paused_until = 0.0
+
+        self.admitted = {INTERACTIVE: 0, BACKGROUND: 0}
+        self.throttled = 0
+
+    # -------------------------
+    # Admission
+    # -------------------------
+    def acquire(self, lane: str, tokens: int):
+        """
+        Block the calling thread until the call may be sent.
+        """
+        started = time.monotonic()
+        with self._cond:
+            self._start_waiting(lane)
+            try:
+                while True:
+                    wait = self._try_admit(lane, tokens)
+                    if wait <= 0:
+                        break
+                    self._cond.wait(timeout=wait)
+            finally:
+                self._stop_waiting(lane)
+        self._observe_wait(lane, started)
+
+    async def acquire_async(self, lane: str, tokens: int):
+        """
+        Same as `acquire` without blocking the event loop.
+        """
+        started = time.monotonic()
+        with self._cond:
+            self._start_waiting(lane)
+        try:
+            while True:
+                with self._cond:
+                    wait = self._try_admit(lane, tokens)
+                if wait <= 0:
+                    break
+                await asyncio.sleep(min(wait, _POLL_SECONDS))
+        finally:
+            with self._cond:
+                self._stop_waiting(lane)
+        self._observe_wait(lane, started)
+
+    def release(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def backoff(self, seconds: float):
+        """
+        Pause all lanes, e.g. for a 429's Retry-After.
+        """
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self.throttled += 1
+        metrics.increment("llm_throttled_total", scheduler=self.name)
+
+    def stats(self) -> Dict[str, float]:
+        with self._cond:
+            return {
+                "in_flight": self._in_flight,
+                "interactive_waiting": self._interactive_waiting,
+                "admitted_interactive": self.admitted[INTERACTIVE],
+                "admitted_background": self.admitted[BACKGROUND],
+                "throttled": self.throttled,
+                "paused_for": max(0.0, self._paused_until - time.monotonic()),
+            }
+
+    # -------------------------
+    # Internals (caller holds the condition)
+    # -------------------------
+    def _try_admit(self, lane: str, tokens: int) -> float:
+        """
+        Admit the call and return 0, or return how long to wait before retrying.
+        """
+        now = time.monotonic()
+        if now < self._paused_until:
+            return self._paused_until - now
+
+        if lane == BACKGROUND and self._interactive_waiting:
+            return _POLL_SECONDS
+
+        limit = self.max_concurrency if lane == INTERACTIVE else self.background_max_concurrency
+        if self._in_flight >= limit:
+            # woken up by release()
+            return _POLL_SECONDS
+
+        self._requests.refill(now)
+        self._tokens.refill(now)
+        wait = max(self._requests.wait_for(1), self._tokens.wait_for(tokens))
+        if wait > 0:
+            return wait
+
+        self._requests.level -= 1
+        self._tokens.level -= tokens
+        self._in_flight += 1
+        self.admitted[lane] += 1
+        return 0.0
+
+    def _start_waiting(self, lane: str):
+        if lane == INTERACTIVE:
+            self._interactive_waiting += 1
+
+    def _stop_waiting(self, lane: str):
+        if lane == INTERACTIVE:
+            self._interactive_waiting -= 1
+
+    def _observe_wait(self, lane: str, started: float):
+        metrics.observe("llm_queue_seconds", time.monotonic() - started, scheduler=self.name, lane=lane)
+
+
+def _share(limit: int) -> int:
+    """
+    This process's part of a per-deployment limit.
+    """
+    return max(1, limit // max(1, settings.LLM_QUOTA_PROCESSES))
+
+
+schedulers = {
+    "chat": OpenAIScheduler(
+        name="chat",
+        requests_per_minute=_share(settings.LLM_CHAT_REQUESTS_PER_MINUTE),
+        tokens_per_minute=_share(settings.LLM_CHAT_TOKENS_PER_MINUTE),
+        max_concurrency=_share(settings.LLM_MAX_CONCURRENCY),
+        background_max_concurrency=_share(settings.LLM_BACKGROUND_MAX_CONCURRENCY),
+    ),
+    "embeddings": OpenAIScheduler(
+        name="embeddings",
+        requests_per_minute=_share(settings.LLM_EMBEDDING_REQUESTS_PER_MINUTE),
+        tokens_per_minute=_share(settings.LLM_EMBEDDING_TOKENS_PER_MINUTE),
+        max_concurrency=_share(settings.LLM_MAX_CONCURRENCY),
+        background_max_concurrency=_share(settings.LLM_BACKGROUND_MAX_CONCURRENCY),
+    ),
+}
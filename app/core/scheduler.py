@@ -1,6 +1,11 @@
 from apscheduler.schedulers.background import BackgroundScheduler
+from datetime import datetime
+from app.core.answer_cache import answer_cache
+from app.core.config import settings
+from app.core.vector_cache import vector_cache
 from app.db.session import SessionLocal
 from app.services.court_cron_service import CourtCronService
+from app.services.ingestion_service import IngestionService
 import logging
 
 logger = logging.getLogger(__name__)
@@ -26,5 +31,29 @@ def start_scheduler():
         replace_existing=True,
     )
 
+    # files are trained in the ingestion worker process; our in-memory caches
+    # for those cases are stale once its job succeeds
+    trained_cursor = {"since": datetime.utcnow()}
+
+    def sync_trained_cases_job():
+        db = SessionLocal()
+        try:
+            case_ids, trained_cursor["since"] = IngestionService(db).trained_cases_since(trained_cursor["since"])
+        finally:
+            db.close()
+        for case_id in case_ids:
+            vector_cache.invalidate(case_id)
+            answer_cache.invalidate(case_id)
+
+    scheduler.add_job(
+        sync_trained_cases_job,
+        trigger="interval",
+        seconds=settings.INGESTION_CACHE_SYNC_SECONDS,
+        id="sync_trained_cases",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+    )
+
     scheduler.start()
     logger.info("Court date cron scheduler started")
@@ -0,0 +1,149 @@
+# app/core/vector_cache.py
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+
+def normalize_rows(vectors) -> np.ndarray:
+    """
+    Convert vectors to a contiguous float32 matrix with unit-length rows.
+    Zero rows stay zero instead of producing NaNs.
+    """
+    matrix = np.array(vectors, dtype=np.float32, copy=True, order="C")
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return matrix
+
+
+class CaseVectorIndex:
+    """
+    Pre-normalized float32 matrix of every chunk vector of a case,
+    row-aligned with the embedding ids.
+    """
+
+    def __init__(self, ids: np.ndarray, matrix: np.ndarray):
+        self.ids = ids
+        self.matrix = matrix
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.ids.nbytes + self.matrix.nbytes)
+
+    def __len__(self) -> int:
+        return int(self.ids.shape[0])
+
+    def similarities(self, query_vector: Sequence[float]) -> np.ndarray:
+        """
+        Cosine similarity of the query against every row (single mat-vec).
+        """
+        q = normalize_rows(query_vector)[0]
+        return self.matrix @ q
+
+
+class CaseVectorCache:
+    """
+    Process-level, byte-bounded LRU cache of CaseVectorIndex objects.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[int, CaseVectorIndex]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # -------------------------
+    # Lookups
+    # -------------------------
+    def get(self, case_id: int) -> Optional[CaseVectorIndex]:
+        with self._lock:
+            index = self._entries.get(case_id)
+            if index is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(case_id)
+            self.hits += 1
+            return index
+
+    def get_or_load(
+        self,
+        case_id: int,
+        loader: Callable[[], Tuple[Sequence[int], Sequence[Sequence[float]]]],
+    ) -> CaseVectorIndex:
+        index = self.get(case_id)
+        if index is not None:
+            return index
+
+        ids, vectors = loader()
+        index = self._build(ids, vectors)
+        self.put(case_id, index)
+        return index
+
+    # -------------------------
+    # Mutations
+    # -------------------------
+    def put(self, case_id: int, index: CaseVectorIndex):
+        with self._lock:
+            self._drop(case_id)
+            if index.nbytes > self.max_bytes:
+                # larger than the whole budget -> serve it once, never keep it
+                return
+            self._entries[case_id] = index
+            self._bytes += index.nbytes
+            self._evict()
+
+    def invalidate(self, case_id: int):
+        with self._lock:
+            self._drop(case_id)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "cases": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+            }
+
+    # -------------------------
+    # Internals (caller holds the lock)
+    # -------------------------
+    def _build(self, ids, vectors) -> CaseVectorIndex:
+        ids = np.asarray(ids, dtype=np.int64)
+        if ids.shape[0] == 0:
+            return CaseVectorIndex(ids=ids, matrix=np.zeros((0, 0), dtype=np.float32))
+        return CaseVectorIndex(ids=ids, matrix=normalize_rows(vectors))
+
+    def _drop(self, case_id: int):
+        old = self._entries.pop(case_id, None)
+        if old is not None:
+            self._bytes -= old.nbytes
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._entries:
+            _, old = self._entries.popitem(last=False)
+            self._bytes -= old.nbytes
+            self.evictions += 1
+
+
+vector_cache = CaseVectorCache(max_bytes=settings.VECTOR_CACHE_MAX_BYTES)
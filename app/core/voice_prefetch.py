@@ -0,0 +1,151 @@
+# app/core/voice_prefetch.py
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.embedding_cache import normalize_query_text
+
+
+class _Meeting:
+    def __init__(self, max_lines: int):
+        self.lines = deque(maxlen=max_lines)
+        self.question: Optional[str] = None
+        self.task: Optional[asyncio.Future] = None
+        self.started_at = 0.0
+
+
+class VoicePrefetchStore:
+    """
+    Rolling transcript per case plus one speculative answer plan for the most
+    recent candidate question in it.
+
+    A new candidate cancels the previous prefetch; `take` hands the prefetch to
+    the answering request when it asks the same (normalized) question.
+    """
+
+    def __init__(self, max_lines: int, ttl_seconds: int, max_meetings: int = 256):
+        self.max_lines = max_lines
+        self.ttl_seconds = ttl_seconds
+        self.max_meetings = max_meetings
+        self._meetings: "OrderedDict[int, _Meeting]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.started = 0
+        self.superseded = 0
+        self.hits = 0
+        self.misses = 0
+
+    def append(self, case_id: int, lines: List[str]) -> List[str]:
+        """
+        Add transcript lines and return the transcript kept so far.
+        """
+        with self._lock:
+            meeting = self._meeting(case_id)
+            meeting.lines.extend(line for line in lines if line and line.strip())
+            return list(meeting.lines)
+
+    def start(
+        self,
+        case_id: int,
+        question: str,
+        plan: Callable[[], Awaitable[Dict[str, Any]]],
+    ) -> bool:
+        """
+        Prefetch `plan()` for the question unless it is already being prefetched.
+        Must be called from the event loop that will consume the result.
+        """
+        key = normalize_query_text(question)
+        if not key:
+            return False
+
+        with self._lock:
+            meeting = self._meeting(case_id)
+            if meeting.question == key and meeting.task is not None and self._fresh(meeting):
+                return False
+
+            if meeting.task is not None and not meeting.task.done():
+                meeting.task.cancel()
+                self.superseded += 1
+
+            meeting.question = key
+            meeting.task = asyncio.ensure_future(plan())
+            meeting.task.add_done_callback(_consume_result)
+            meeting.started_at = time.monotonic()
+            self.started += 1
+            return True
+
+    def take(self, case_id: int, question: str) -> Optional[asyncio.Future]:
+        """
+        The prefetched plan for this question, if any. Each prefetch is used once.
+        """
+        key = normalize_query_text(question)
+
+        with self._lock:
+            meeting = self._meetings.get(case_id)
+            usable = (
+                meeting is not None
+                and meeting.task is not None
+                and meeting.question == key
+                and self._fresh(meeting)
+                and not meeting.task.cancelled()
+            )
+            if not usable:
+                self.misses += 1
+                return None
+
+            task = meeting.task
+            meeting.task = None
+            meeting.question = None
+            self.hits += 1
+            return task
+
+    def reset(self, case_id: int):
+        with self._lock:
+            meeting = self._meetings.pop(case_id, None)
+            if meeting is not None and meeting.task is not None:
+                meeting.task.cancel()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "meetings": len(self._meetings),
+                "prefetches": self.started,
+                "superseded": self.superseded,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+            }
+
+    # -------------------------
+    # Internals (caller holds the lock)
+    # -------------------------
+    def _meeting(self, case_id: int) -> _Meeting:
+        meeting = self._meetings.get(case_id)
+        if meeting is None:
+            meeting = self._meetings[case_id] = _Meeting(self.max_lines)
+        self._meetings.move_to_end(case_id)
+
+        while len(self._meetings) > self.max_meetings:
+            _, old = self._meetings.popitem(last=False)
+            if old.task is not None:
+                old.task.cancel()
+        return meeting
+
+    def _fresh(self, meeting: _Meeting) -> bool:
+        return (time.monotonic() - meeting.started_at) <= self.ttl_seconds
+
+
+def _consume_result(task: asyncio.Future):
+    # prefetches nobody asked for must not log "exception was never retrieved"
+    if not task.cancelled():
+        task.exception()
+
+
+voice_prefetch = VoicePrefetchStore(
+    max_lines=settings.VOICE_TRANSCRIPT_MAX_LINES,
+    ttl_seconds=settings.VOICE_PREFETCH_TTL_SECONDS,
+)
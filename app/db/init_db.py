@@ -5,13 +5,14 @@ from app.db.base import Base
 import logging
 
 def init_extensions():
-    # Create all tables if not exist
-    from app import models  # import to ensure modules define models
-    Base.metadata.create_all(bind=engine)
-    # Try to create pgvector if available - ignore errors
+    # pgvector must exist before tables using the vector type are created
     try:
-        with engine.connect() as conn:
+        with engine.begin() as conn:
             conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector;"))
             logging.info("pgvector extension created (if supported).")
     except Exception as e:
         logging.info(f"Could not create pgvector extension: {e}")
+
+    # Create all tables if not exist
+    from app import models  # import to ensure modules define models
+    Base.metadata.create_all(bind=engine)
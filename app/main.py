@@ -1,8 +1,10 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from app.api.api_router import api_router
 from app.core.config import settings
+from app.core.metrics import metrics
 from app.db import init_db
 import logging
 from app.core.logging import configure_logging
@@ -10,6 +12,9 @@ import os
 from app.core.scheduler import start_scheduler
 from app.services.auth_service import seed_roles
 from app.db.session import SessionLocal
+from app.services.embedding_service import EmbeddingService
+from app.services.qa_service import STATIC_QUERIES
+from app.services.intent_classifier import intent_classifier
 
 configure_logging()
 
@@ -29,6 +34,11 @@ app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR), name="uploads"
 app.include_router(api_router, prefix="/api")
 
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def prometheus_metrics():
+    return metrics.render_prometheus()
+
+
 @app.on_event("startup")
 def startup_event():
     logging.info("Starting up: initializing DB...")
@@ -43,6 +53,12 @@ def startup_event():
     finally:
         db.close()
 
+    # ✅ Precompute static query vectors (never fatal)
+    try:
+        EmbeddingService().warm_queries(STATIC_QUERIES + intent_classifier.example_texts())
+    except Exception as e:
+        logging.warning(f"Could not precompute static query embeddings: {e}")
+
     logging.info("DB initialized. Starting scheduler...")
 
     # ✅ Safe to start cron now
@@ -3,10 +3,13 @@ from app.models.refresh_token import RefreshToken
 from app.models.case import Case
 from app.models.case_file import CaseFile
 from app.models.embedding import Embedding
+from app.models.chunk_posting import ChunkPosting
+from app.models.embedding_cache import EmbeddingCacheEntry
 from app.models.role import Role
 from app.models.chat_session import ChatSession
 from app.models.chat_message import ChatMessage
 from app.models.case_metadata import CaseMetadata
 from app.models.upcoming_meeting import UpcomingMeeting
+from app.models.ingestion_job import IngestionJob
 from .associations import user_roles
 from .associations_case_user import case_users
\ No newline at end of file
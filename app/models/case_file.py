@@ -30,6 +30,8 @@ class CaseFile(Base):
     file_path = Column(String, nullable=True)
     file_size = Column(Integer)
     content_type = Column(String, nullable=True)
+    # sha256 hex of the bytes; file_path is "<content_hash><ext>", shared by identical uploads
+    content_hash = Column(String(64), nullable=True, index=True)
 
     status = Column(
         Enum(FileStatus, name="file_status_enum"),
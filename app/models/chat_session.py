@@ -16,6 +16,8 @@ class ChatSession(Base):
 
     # ⭐ THIS is where summary lives
     summary = Column(Text, nullable=True)
+    # last ChatMessage.id folded into `summary`; later messages are kept verbatim
+    summary_through_id = Column(Integer, nullable=True)
 
     case = relationship("Case", back_populates="sessions")
     messages = relationship(
@@ -0,0 +1,28 @@
+# app/models/chunk_posting.py
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+from app.db.base import Base
+
+
+class ChunkPosting(Base):
+    """
+    Inverted index entry: `term` occurs `tf` times in chunk `embedding_id`.
+    case_id is denormalized so a question only touches its own case's postings.
+    """
+    __tablename__ = "chunk_postings"
+
+    embedding_id = Column(
+        Integer,
+        ForeignKey("embeddings.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    term = Column(String(64), primary_key=True)
+    case_id = Column(
+        Integer,
+        ForeignKey("cases.id", ondelete="CASCADE"),
+        nullable=False
+    )
+    tf = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index("ix_chunk_postings_case_term", "case_id", "term"),
+    )
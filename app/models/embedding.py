@@ -1,14 +1,38 @@
 # app/models/embedding.py
-from sqlalchemy import Column, Integer, ForeignKey, Float, ARRAY, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Computed, Integer, ForeignKey, Index, Text, Float, LargeBinary
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
+from pgvector.sqlalchemy import Vector
 from app.db.base import Base
+from app.core.config import settings
 
 class Embedding(Base):
     __tablename__ = "embeddings"
     id = Column(Integer, primary_key=True, index=True)
-    file_id = Column(Integer, ForeignKey("case_files.id", ondelete="CASCADE"), nullable=False)
+    file_id = Column(Integer, ForeignKey("case_files.id", ondelete="CASCADE"), nullable=False, index=True)
     chunk_text = Column(Text, nullable=False)
-    # store vector as postgres float[]; change to pgvector.Vector if you add the pgvector package
-    vector = Column(ARRAY(Float), nullable=False)
+    # generated by Postgres, GIN-indexed for full-text retrieval (RAG_RETRIEVAL_MODE=rrf)
+    chunk_tsv = deferred(Column(
+        TSVECTOR,
+        Computed("to_tsvector('english', chunk_text)", persisted=True),
+    ))
+    # pgvector column, searched through the HNSW index ix_embeddings_vector_hnsw (cosine ops)
+    vector = Column(Vector(settings.EMBEDDING_DIMENSIONS), nullable=True)
+    # compact storage (EMBEDDING_STORAGE_MODE=float32|int8), see app/utils/vector_codec.py
+    vector_blob = Column(LargeBinary, nullable=True)
+    vector_scale = Column(Float, nullable=True)
+    # BM25 document length (tokens after app.utils.lexical.tokenize)
+    token_count = Column(Integer, nullable=True)
     document_metadata = Column(Text, nullable=True)
     file = relationship("CaseFile", back_populates="embeddings")
+
+    __table_args__ = (
+        Index(
+            "ix_embeddings_vector_hnsw",
+            "vector",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"vector": "vector_cosine_ops"},
+        ),
+        Index("ix_embeddings_chunk_tsv", "chunk_tsv", postgresql_using="gin"),
+    )
@@ -0,0 +1,16 @@
+# app/models/embedding_cache.py
+from sqlalchemy import Column, String, LargeBinary, DateTime, func
+from app.db.base import Base
+
+
+class EmbeddingCacheEntry(Base):
+    """
+    Persistent text -> vector cache, scoped by embedding deployment so a model
+    change never serves stale vectors. vector is raw little-endian float32.
+    """
+    __tablename__ = "embedding_cache"
+
+    deployment = Column(String(255), primary_key=True)
+    text_hash = Column(String(64), primary_key=True)  # sha256 hex of the cache key text
+    vector = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
@@ -0,0 +1,70 @@
+# app/models/ingestion_job.py
+from sqlalchemy import Column, Integer, String, Boolean, Text, ForeignKey, DateTime, Enum, Index, func, text
+from sqlalchemy.orm import relationship
+from app.db.base import Base
+import enum
+
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+
+
+class IngestionJob(Base):
+    """
+    One training run of an approved file (extract -> chunk -> embed, optionally
+    followed by case metadata extraction), claimed by app.worker.
+
+    A RUNNING job whose lease has expired belongs to a dead worker and is
+    claimed again.
+    """
+    __tablename__ = "ingestion_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    file_id = Column(
+        Integer,
+        ForeignKey("case_files.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+    extract_metadata = Column(Boolean, default=False, nullable=False)
+
+    status = Column(
+        Enum(JobStatus, name="ingestion_job_status_enum"),
+        default=JobStatus.QUEUED,
+        nullable=False,
+    )
+    attempts = Column(Integer, default=0, nullable=False)
+    error = Column(Text, nullable=True)
+
+    # worker that holds the job and until when; renewed by its heartbeat
+    locked_by = Column(String(255), nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+
+    chunks_total = Column(Integer, nullable=True)
+    chunks_done = Column(Integer, default=0, nullable=False)
+    # identical bytes already trained elsewhere: chunks were copied from that file
+    reused_from_file_id = Column(Integer, ForeignKey("case_files.id", ondelete="SET NULL"), nullable=True)
+    embedding_calls_saved = Column(Integer, default=0, nullable=False)
+
+    created_at = Column(DateTime, server_default=func.now())
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    file = relationship("CaseFile", foreign_keys=[file_id], lazy="select")
+
+    __table_args__ = (
+        # claim query: oldest queued (or lease-expired) job first
+        Index("ix_ingestion_jobs_status_id", "status", "id"),
+        # at most one live job per file
+        Index(
+            "uq_ingestion_jobs_active_file",
+            "file_id",
+            unique=True,
+            postgresql_where=text("status IN ('QUEUED', 'RUNNING')"),
+        ),
+    )
@@ -0,0 +1,109 @@
+# app/reencode_embeddings.py
+"""
+Rewrite stored embedding vectors in a storage mode.
+
+EMBEDDING_STORAGE_MODE only applies to rows written after it is set; run this
+after changing it so existing rows follow (pgvector search skips blob-only
+rows, and the compact modes only save space once rows are converted):
+
+    python -m app.reencode_embeddings                # settings.EMBEDDING_STORAGE_MODE
+    python -m app.reencode_embeddings --mode int8
+
+Rows already in the target format are skipped and every batch is committed on
+its own, so the command can be interrupted and run again.
+"""
+import argparse
+import logging
+
+import sqlalchemy as sa
+
+from app.core.config import settings
+from app.utils.vector_codec import STORAGE_MODES, decode_blob, encode_blob, normalize_vector
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+# rows not yet in the target format
+_PENDING = {
+    "pgvector": "vector IS NULL AND vector_blob IS NOT NULL",
+    "float32": "vector IS NOT NULL OR (vector_blob IS NOT NULL AND vector_scale IS NOT NULL)",
+    "int8": "vector IS NOT NULL OR (vector_blob IS NOT NULL AND vector_scale IS NULL)",
+}
+
+
+def reencode_embeddings(conn, mode: str, commit_batches: bool = False, batch_size: int = BATCH_SIZE) -> int:
+    """
+    Stream the rows to convert in id order (keyset pagination, `batch_size`
+    rows in memory) and rewrite each one in `mode`. Returns the number of
+    rows rewritten. Inside a migration, leave `commit_batches` off: alembic
+    owns the transaction.
+    """
+    mode = mode.lower()
+    if mode not in STORAGE_MODES:
+        raise ValueError(f"Unknown embedding storage mode {mode!r} (expected one of {', '.join(STORAGE_MODES)})")
+
+    select = sa.text(
+        "SELECT id, vector::real[] AS vec, vector_blob, vector_scale FROM embeddings "
+        f"WHERE id > :last_id AND ({_PENDING[mode]}) "
+        "ORDER BY id LIMIT :limit"
+    )
+    if mode == "pgvector":
+        update = sa.text(
+            "UPDATE embeddings SET vector = CAST(:vec AS vector), vector_blob = NULL, vector_scale = NULL "
+            "WHERE id = :id"
+        )
+    else:
+        update = sa.text(
+            "UPDATE embeddings SET vector_blob = :blob, vector_scale = :scale, vector = NULL "
+            "WHERE id = :id"
+        )
+
+    last_id = 0
+    total = 0
+    while True:
+        rows = conn.execute(select, {"last_id": last_id, "limit": batch_size}).fetchall()
+        if not rows:
+            break
+
+        params = []
+        for row in rows:
+            vec = row.vec if row.vec is not None else decode_blob(bytes(row.vector_blob), row.vector_scale)
+            if mode == "pgvector":
+                vec = normalize_vector(vec)
+                params.append({"id": row.id, "vec": "[" + ",".join(repr(float(x)) for x in vec) + "]"})
+            else:
+                blob, scale = encode_blob(vec, mode)
+                params.append({"id": row.id, "blob": blob, "scale": scale})
+
+        conn.execute(update, params)
+        if commit_batches:
+            conn.commit()
+
+        total += len(rows)
+        last_id = rows[-1].id
+        logger.info("re-encoded %d embeddings to %s (last id %d)", total, mode, last_id)
+
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode", type=str.lower, default=settings.EMBEDDING_STORAGE_MODE or "pgvector", choices=STORAGE_MODES)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    # imported here: the migration that uses reencode_embeddings runs on alembic's connection
+    from app.core.logging import configure_logging
+    from app.db.session import engine
+
+    configure_logging()
+
+    with engine.connect() as conn:
+        total = reencode_embeddings(conn, args.mode, commit_batches=True, batch_size=args.batch_size)
+
+    logger.info("done: %d embeddings re-encoded to %s", total, args.mode)
+
+
+if __name__ == "__main__":
+    main()
@@ -53,6 +53,8 @@ class CreateCaseOut(BaseModel):
     case_name: str
     case_no: str
     created_at: datetime
+    # training of the uploaded file runs in the ingestion worker
+    ingestion_job_id: Optional[int] = None
 
     class Config:
         from_attributes = True  # Pydantic v2
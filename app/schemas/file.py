@@ -1,12 +1,41 @@
 # app/schemas/file.py
-from pydantic import BaseModel
+from pydantic import BaseModel, computed_field
 from typing import List, Optional
+from datetime import datetime
 
 class FileUploadResponse(BaseModel):
     file_id: int
     saved: bool
     message: str
     file_path: Optional[str] = None
+    sha256: Optional[str] = None
+    duplicate: bool = False  # same bytes were already uploaded to this case
+
+class IngestionJobOut(BaseModel):
+    id: int
+    file_id: int
+    status: str
+    attempts: int
+    chunks_done: int
+    chunks_total: Optional[int] = None
+    reused_from_file_id: Optional[int] = None
+    embedding_calls_saved: int = 0
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    @computed_field
+    @property
+    def progress(self) -> Optional[float]:
+        # fraction of chunks embedded; unknown until the file has been chunked
+        if not self.chunks_total:
+            return None
+        return self.chunks_done / self.chunks_total
+
+    model_config = {"from_attributes": True}
+
+
 class CaseFileNameOut(BaseModel):
     id: int
     filename: str
@@ -69,6 +69,7 @@ Description: {metadata.case_description}
             messages=[{"role": "user", "content": prompt}],
             temperature=0.25,
             max_tokens=900,
+            call_site="ppt",
         )
 
         structured_text = response.choices[0].message.content
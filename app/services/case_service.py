@@ -1,6 +1,6 @@
 # app/services/case_service.py
 
-from typing import Optional
+from typing import Callable, Optional
 from sqlalchemy.orm import Session, joinedload
 from datetime import datetime
 
@@ -10,7 +10,6 @@ from app.models.case_metadata import CaseMetadata
 from app.services.embedding_service import EmbeddingService
 from app.services.qa_service import QAService
 from app.services.file_service import FileService
-from app.models.case_file import FileStatus
 
 
 class CaseService:
@@ -141,9 +140,15 @@ class CaseService:
     # -------------------------
     # FILE PROCESSING (NEW FLOW)
     # -------------------------
-    async def process_file_and_extract_metadata(self, file_id: int) -> dict:
+    def process_file_and_extract_metadata(
+        self,
+        file_id: int,
+        extract_metadata: bool = True,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> dict:
         """
-        Process file ONLY if approved (file-level).
+        Train an APPROVED file, then optionally extract and merge case
+        metadata. Runs in the ingestion worker (app.worker).
         """
 
         file_model = self.file_service.get_file_by_id(file_id)
@@ -151,15 +156,11 @@ class CaseService:
         if not file_model:
             raise ValueError("File not found")
 
-        # ✅ Check file-level approval
-        if file_model.status != FileStatus.APPROVED:
-            return {
-                "processed": False,
-                "message": "File not approved by admin"
-            }
+        # ✅ Process embeddings (raises when the file is not approved)
+        result = self.file_service.process_file_embeddings(file_id, progress=progress)
 
-        # ✅ Process embeddings (safe)
-        result = await self.file_service.process_file_embeddings_safe(file_id)
+        if not extract_metadata or not result.get("processed"):
+            return {**result, "metadata": None}
 
         # ✅ Extract metadata AFTER processing
         extracted_metadata = self.qa_service.extract_case_metadata_for_file(file_id)
@@ -171,6 +172,6 @@ class CaseService:
             )
 
         return {
-            "processed": True,
+            **result,
             "metadata": extracted_metadata
         }
\ No newline at end of file
@@ -0,0 +1,171 @@
+# app/services/chat_history_service.py
+import asyncio
+import logging
+import threading
+from typing import Dict, List
+
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.azure_openai import client
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.utils.tokens import MESSAGE_OVERHEAD_TOKENS, count_tokens, message_tokens
+
+logger = logging.getLogger(__name__)
+
+# oldest messages folded per compaction; a long backlog is worked off over several turns
+MAX_MESSAGES_PER_COMPACTION = 40
+
+# sessions with a compaction running, so turns arriving meanwhile don't start another
+_compacting = set()
+_compacting_lock = threading.Lock()
+
+
+class ChatHistoryService:
+    """
+    Prompt history of a chat session with a bounded size:
+    - the rolling `ChatSession.summary` of everything up to `summary_through_id`
+    - the messages after it, verbatim, newest first as far as the token budget goes
+
+    Messages older than the last CHAT_HISTORY_MAX_TURNS turns are folded into
+    the summary by `compact`, which runs in the background after a turn, so
+    prompt size stays flat however long the session is. Until then they stay
+    in the prompt verbatim (budget permitting) rather than dropping out.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def load(self, session_id: int) -> List[Dict[str, str]]:
+        session = self.db.get(models.ChatSession, session_id)
+        if session is None:
+            return []
+
+        budget = settings.CHAT_HISTORY_TOKEN_BUDGET
+        summary_message = None
+        if session.summary:
+            summary_message = {
+                "role": "system",
+                "content": f"Summary of the earlier conversation:\n{session.summary}"
+            }
+            budget -= message_tokens(summary_message)
+
+        # newest first, then keep as many as fit; not capped at the verbatim
+        # window, so messages waiting for compaction aren't left out (the
+        # limit is just the most messages the budget could possibly hold)
+        recent = (
+            self._unsummarized(session)
+            .order_by(models.ChatMessage.id.desc())
+            .limit(max(0, budget) // MESSAGE_OVERHEAD_TOKENS)
+            .all()
+        )
+
+        kept = []
+        for msg in recent:
+            item = {"role": msg.role, "content": msg.content}
+            cost = message_tokens(item)
+            if cost > budget:
+                break
+            budget -= cost
+            kept.append(item)
+
+        kept.reverse()
+        return ([summary_message] if summary_message else []) + kept
+
+    def compact(self, session_id: int) -> bool:
+        """
+        Fold the messages older than the verbatim window into the summary.
+        Returns True when the summary was updated.
+        """
+        session = self.db.get(models.ChatSession, session_id)
+        if session is None:
+            return False
+
+        pending = (
+            self._unsummarized(session)
+            .order_by(models.ChatMessage.id.asc())
+            .all()
+        )
+
+        older = pending[:-2 * settings.CHAT_HISTORY_MAX_TURNS] if settings.CHAT_HISTORY_MAX_TURNS else pending
+        if len(older) < settings.CHAT_SUMMARY_MIN_MESSAGES:
+            return False
+        older = older[:MAX_MESSAGES_PER_COMPACTION]
+
+        transcript = "\n".join(f"{m.role}: {m.content}" for m in older)
+
+        completion = client.chat.completions.create(
+            model=settings.AZURE_OPENAI_CHAT_DEPLOYMENT,
+            messages=[
+                {
+                    "role": "system",
+                    "content": (
+                        "You maintain the running summary of a legal case chat.\n"
+                        "Merge the existing summary and the new messages into one concise summary.\n"
+                        "Keep facts, names, dates, questions asked and answers given. "
+                        "Do not invent anything."
+                    )
+                },
+                {
+                    "role": "user",
+                    "content": (
+                        f"Existing summary:\n{session.summary or '(none)'}\n\n"
+                        f"New messages:\n{transcript}"
+                    )
+                }
+            ],
+            temperature=0,
+            max_tokens=settings.CHAT_SUMMARY_MAX_TOKENS,
+            call_site="chat_summary"
+        )
+
+        summary = (completion.choices[0].message.content or "").strip()
+        if not summary:
+            return False
+
+        session.summary = summary
+        session.summary_through_id = older[-1].id
+        self.db.commit()
+
+        logger.info(
+            "Compacted %s messages of chat session %s into a %s-token summary",
+            len(older), session_id, count_tokens(summary)
+        )
+        return True
+
+    def _unsummarized(self, session):
+        query = self.db.query(models.ChatMessage).filter(
+            models.ChatMessage.session_id == session.id
+        )
+        if session.summary_through_id is not None:
+            query = query.filter(models.ChatMessage.id > session.summary_through_id)
+        return query
+
+
+def compact_session(session_id: int):
+    """
+    Background entry point: own DB session, at most one compaction per chat session.
+    """
+    with _compacting_lock:
+        if session_id in _compacting:
+            return
+        _compacting.add(session_id)
+
+    db = SessionLocal()
+    try:
+        ChatHistoryService(db).compact(session_id)
+    except Exception:
+        db.rollback()
+        logger.exception("Chat history compaction failed for session %s", session_id)
+    finally:
+        db.close()
+        with _compacting_lock:
+            _compacting.discard(session_id)
+
+
+def schedule_compaction(session_id: int):
+    """
+    Fire-and-forget compaction from async code; the LLM call runs in the default executor.
+    """
+    asyncio.get_running_loop().run_in_executor(None, compact_session, session_id)
@@ -1,10 +1,17 @@
 # app/services/chat_service.py
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
 from typing import List
+import logging
 
 from app import models
+from app.db.session import SessionLocal
 from app.services.qa_service import QAService
+from app.services.chat_history_service import schedule_compaction
+from app.utils.sse import sse_event
+
+logger = logging.getLogger(__name__)
 
 
 class ChatService:
@@ -44,7 +51,7 @@ class ChatService:
 
         return session, messages
 
-    def send_message(
+    def _start_turn(
         self,
         case_id: int,
         user_id: int,
@@ -76,12 +83,66 @@ class ChatService:
         ))
         self.db.commit()
 
+        return session
+
+    async def send_message(
+        self,
+        case_id: int,
+        user_id: int,
+        session_id: int,
+        message: str
+    ):
+        # sync DB work: keep it off the event loop
+        session = await run_in_threadpool(self._start_turn, case_id, user_id, session_id, message)
+
         # Generate answer
         qa = QAService(self.db)
-        result = qa.answer_chat_question(
+        result = await qa.answer_chat_question(
             case_id=case_id,
             session_id=session.id,
             question=message
         )
 
+        # fold old turns into the session summary off the request path
+        schedule_compaction(session.id)
+
         return result["answer"]
+
+    def stream_message(
+        self,
+        case_id: int,
+        user_id: int,
+        session_id: int,
+        message: str
+    ):
+        """
+        Validates the session and saves the user message right away (so errors
+        surface before the response starts), then returns an async generator of
+        SSE frames for the answer.
+        """
+        session = self._start_turn(case_id, user_id, session_id, message)
+        return self._stream_answer(case_id, session.id, message)
+
+    async def _stream_answer(self, case_id: int, session_id: int, message: str):
+        # the request-scoped session may be closed before the body is sent
+        db = SessionLocal()
+        try:
+            qa = QAService(db)
+            async for event, payload in qa.stream_chat_answer(
+                case_id=case_id,
+                session_id=session_id,
+                question=message
+            ):
+                if event == "delta":
+                    yield sse_event("delta", {"text": payload})
+                else:
+                    yield sse_event("done", {
+                        "answer": payload["answer"],
+                        "session_id": session_id
+                    })
+                    schedule_compaction(session_id)
+        except Exception:
+            logger.exception("Chat answer stream failed for session %s", session_id)
+            yield sse_event("error", {"detail": "Failed to generate an answer"})
+        finally:
+            db.close()
@@ -1,7 +1,19 @@
 # app/services/embedding_service.py
 from app.core.config import settings
-from app.core.azure_openai import client
-from typing import List
+from app.core.azure_openai import client, async_client
+from app.core.embedding_cache import chunk_embedding_cache, query_embedding_cache
+from app.core.metrics import metrics
+from app.utils.tokens import count_tokens
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Tuple
+
+import logging
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
 
 class EmbeddingService:
     def __init__(self):
@@ -9,13 +21,117 @@ class EmbeddingService:
 
     def create_embedding(self, text: str) -> List[float]:
         # single embedding call
-        resp = client.embeddings.create(model=settings.AZURE_OPENAI_EMBEDDING_DEPLOYMENT, input=text)
+        resp = client.embeddings.create(
+            model=settings.AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
+            input=text,
+            call_site="embed",
+        )
         vector = resp.data[0].embedding
         return vector
 
-    def create_embeddings_for_chunks(self, chunks: List[str]) -> List[List[float]]:
-        vectors = []
-        for c in chunks:
-            v = self.create_embedding(c)
-            vectors.append(v)
-        return vectors
+    def embed_query(self, text: str) -> np.ndarray:
+        # questions / search queries go through the query-embedding cache
+        return query_embedding_cache.get_or_create(
+            settings.AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
+            text,
+            self.create_embedding,
+        )
+
+    async def create_embedding_async(self, text: str) -> List[float]:
+        resp = await async_client.embeddings.create(
+            model=settings.AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
+            input=text,
+            call_site="embed_query",
+        )
+        return resp.data[0].embedding
+
+    async def embed_query_async(self, text: str) -> np.ndarray:
+        return await query_embedding_cache.get_or_create_async(
+            settings.AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
+            text,
+            self.create_embedding_async,
+        )
+
+    def warm_queries(self, texts: Iterable[str]):
+        for text in texts:
+            self.embed_query(text)
+
+    def iter_embeddings(self, chunks: Iterable[str]) -> Iterator[Tuple[List[str], List[List[float]]]]:
+        """
+        One vector per chunk, yielded as (chunks, vectors) batch by batch in
+        chunk order. Chunks are grouped by iter_batches (EMBEDDING_BATCH_SIZE
+        inputs / EMBEDDING_BATCH_MAX_TOKENS tokens each); chunks already in the
+        chunk embedding cache are not sent again. At most EMBEDDING_CONCURRENCY batches are in
+        flight; the next batch is only pulled from `chunks` once the oldest one
+        has been handed to the consumer, so a slow consumer (DB writes) also
+        holds back the producer (extraction, chunking).
+        """
+        started = time.perf_counter()
+        total = 0
+
+        pool = ThreadPoolExecutor(max_workers=settings.EMBEDDING_CONCURRENCY)
+        pending = deque()
+        try:
+            for batch in iter_batches(chunks, settings.EMBEDDING_BATCH_SIZE, settings.EMBEDDING_BATCH_MAX_TOKENS):
+                pending.append((batch, pool.submit(self._embed_batch_cached, batch)))
+                if len(pending) >= settings.EMBEDDING_CONCURRENCY:
+                    batch, future = pending.popleft()
+                    vectors = future.result()
+                    total += len(batch)
+                    yield batch, vectors
+
+            while pending:
+                batch, future = pending.popleft()
+                vectors = future.result()
+                total += len(batch)
+                yield batch, vectors
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+        self._record_throughput(total, time.perf_counter() - started)
+
+    def _embed_batch_cached(self, texts: List[str]) -> List[List[float]]:
+        if not chunk_embedding_cache.enabled:
+            return self.create_embeddings_batch(texts)
+        return chunk_embedding_cache.get_or_create_many(
+            settings.AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
+            texts,
+            self.create_embeddings_batch,
+        )
+
+    def _record_throughput(self, chunks: int, elapsed: float):
+        rate = chunks / elapsed if elapsed > 0 else 0.0
+        metrics.increment("embedding_chunks_total", chunks)
+        metrics.observe("embedding_chunks_per_second", rate)
+        logger.info("embedded %d chunks in %.2fs (%.1f chunks/s)", chunks, elapsed, rate)
+
+    def create_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+        resp = client.embeddings.create(
+            model=settings.AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
+            input=texts,
+            call_site="embed_chunks",
+        )
+        # data carries the input index; don't rely on response order
+        return [d.embedding for d in sorted(resp.data, key=lambda d: d.index)]
+
+
+def iter_batches(chunks: Iterable[str], max_items: int, max_tokens: int) -> Iterator[List[str]]:
+    """
+    Group chunks into consecutive batches of at most `max_items` inputs and
+    `max_tokens` estimated tokens (a single oversized chunk gets a batch of
+    its own).
+    """
+    current: List[str] = []
+    current_tokens = 0
+
+    for chunk in chunks:
+        tokens = count_tokens(chunk)
+        if current and (len(current) >= max_items or current_tokens + tokens > max_tokens):
+            yield current
+            current, current_tokens = [], 0
+        current.append(chunk)
+        current_tokens += tokens
+
+    if current:
+        yield current
+
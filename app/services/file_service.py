@@ -1,28 +1,42 @@
 # app/services/file_service.py
 
+import json
+import logging
+import math
 import os
 import uuid
+from collections import deque
 from pathlib import Path
 from datetime import datetime
-from typing import Set
+from typing import Callable, Iterable, List, Optional, Sequence, Set, Tuple
 
+from sqlalchemy import event, func, select
 from sqlalchemy.orm import Session
 from fastapi import UploadFile, HTTPException
 from fastapi.responses import FileResponse
-import aiofiles
 
 from app import models
-from app.utils.pdf_parser import extract_text_from_file_path
-from app.utils.text_chunker import chunk_text
+from app.utils.pdf_parser import iter_text_pages_from_file_path, pdf_page_count
+from app.utils.text_chunker import get_chunk_profile, iter_structured_chunks
+from app.utils.upload_stream import UploadRejected, stream_upload_to_file
+from app.utils.vector_codec import embedding_columns, row_vector
 from app.models.case_file import CaseFile, FileStatus
-from app.services.embedding_service import EmbeddingService
+from app.services.embedding_service import EmbeddingService, iter_batches
+from app.services.lexical_index_service import LexicalIndexService
 from app.core.config import settings
+from app.db.session import SessionLocal
+from app.core.vector_cache import vector_cache
+from app.core.answer_cache import answer_cache
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
 
 
 class FileService:
     def __init__(self, db: Session):
         self.db = db
         self.embedding_service = EmbeddingService()
+        self.lexical_index = LexicalIndexService(db)
         Path(settings.UPLOAD_DIR).mkdir(parents=True, exist_ok=True)
 
     # -------------------------
@@ -44,14 +58,6 @@ class FileService:
 
         content_type = (uploaded_file.content_type or "").lower()
         original_filename = os.path.basename(uploaded_file.filename or "file")
-        data = await uploaded_file.read()
-        size = len(data)
-
-        if size == 0:
-            return {"saved": False, "message": "Empty file"}
-
-        if getattr(settings, "MAX_UPLOAD_SIZE_BYTES", None) and size > settings.MAX_UPLOAD_SIZE_BYTES:
-            return {"saved": False, "message": "File too large"}
 
         if allowed_mime and content_type not in allowed_mime:
             return {"saved": False, "message": f"Unsupported MIME: {content_type}"}
@@ -72,16 +78,55 @@ class FileService:
         upload_dir = Path(settings.UPLOAD_DIR)
         local_path = upload_dir / unique_name
 
+        # copied in chunks: the whole file is never held in memory, and size /
+        # file type are checked before the rest of it is accepted
         try:
-            async with aiofiles.open(local_path, "wb") as f:
-                await f.write(data)
+            size, sha256 = await stream_upload_to_file(
+                uploaded_file,
+                str(local_path),
+                expected_ext=ext,
+                max_bytes=getattr(settings, "MAX_UPLOAD_SIZE_BYTES", None),
+                chunk_size=settings.UPLOAD_CHUNK_SIZE_BYTES,
+            )
+        except UploadRejected as e:
+            return {"saved": False, "message": str(e)}
         except Exception as e:
             return {"saved": False, "message": f"File save error: {e}"}
 
+        # re-upload to the same case: keep the existing record
+        existing = (
+            self.db.query(CaseFile)
+            .filter(
+                CaseFile.case_id == case_id,
+                CaseFile.content_hash == sha256,
+                CaseFile.status != FileStatus.REJECTED,
+            )
+            .first()
+        )
+        if existing:
+            local_path.unlink(missing_ok=True)
+            return {
+                "file_id": existing.id,
+                "saved": True,
+                "duplicate": True,
+                "message": "File already uploaded to this case",
+                "file_path": f"/uploads/{existing.file_path}",
+                "sha256": sha256,
+            }
+
+        # content-addressed blob: identical bytes are stored once for all cases
+        blob_name = f"{sha256}{ext}"
+        blob_path = upload_dir / blob_name
+        if blob_path.exists():
+            local_path.unlink(missing_ok=True)
+        else:
+            os.replace(local_path, blob_path)
+
         file_model = CaseFile(
             case_id=case_id,
             filename=original_filename,
-            file_path=unique_name,
+            file_path=blob_name,
+            content_hash=sha256,
             content_type=content_type,
             file_size=size,
             status=FileStatus.DRAFT,
@@ -92,14 +137,16 @@ class FileService:
             self.db.commit()
             self.db.refresh(file_model)
         except Exception as e:
-            local_path.unlink(missing_ok=True)
+            self.db.rollback()
+            # the blob stays: other files may share it, and a retry reuses it
             return {"saved": False, "message": f"DB error: {e}"}
 
         return {
             "file_id": file_model.id,
             "saved": True,
             "message": "File uploaded successfully",
-            "file_path": f"/uploads/{unique_name}",
+            "file_path": f"/uploads/{blob_name}",
+            "sha256": sha256,
         }
 
     # -------------------------
@@ -142,8 +189,21 @@ class FileService:
     # -------------------------
     # PROCESS EMBEDDINGS
     # -------------------------
-    async def process_file_embeddings_safe(self, file_id: int):
-
+    def process_file_embeddings(
+        self,
+        file_id: int,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ):
+        """
+        Extract, chunk and embed an APPROVED file. Runs in the ingestion
+        worker; `progress(done, total)` reports embedded chunks (the total is
+        an estimate until the last page has been read).
+
+        The file row is locked only for the status changes and commits, not
+        for the extraction/embedding run. PROCESSING is accepted too: a job
+        whose worker died left it there (with some of its chunks) and is
+        being retried.
+        """
         file = (
             self.db.query(CaseFile)
             .filter(CaseFile.id == file_id)
@@ -155,55 +215,280 @@ class FileService:
             raise HTTPException(404, "File not found")
 
         if file.status == FileStatus.PROCESSED:
-            return {"message": "Already processed"}
-
-        if file.status == FileStatus.PROCESSING:
-            return {"message": "Already processing"}
+            return {"processed": True, "message": "Already processed"}
 
-        if file.status != FileStatus.APPROVED:
+        if file.status not in (FileStatus.APPROVED, FileStatus.PROCESSING):
             raise HTTPException(400, "File not approved")
 
+        # chunks committed by an earlier attempt that died or failed
+        self._delete_chunks(file_id)
+
+        file.status = FileStatus.PROCESSING
+        self.db.commit()
+
         try:
-            file.status = FileStatus.PROCESSING
-            self.db.commit()
+            source = self._find_trained_copy(file)
+            if source is not None:
+                return self._clone_embeddings(file_id, file.case_id, source, progress)
 
             abs_path = os.path.abspath(os.path.join(settings.UPLOAD_DIR, file.file_path))
 
             if not os.path.exists(abs_path):
-                file.status = FileStatus.REJECTED
-                self.db.commit()
                 raise HTTPException(404, "File missing on disk")
 
-            text = extract_text_from_file_path(abs_path)
+            return self._stream_chunks(file_id, file.case_id, abs_path, progress)
 
-            if not text:
-                file.status = FileStatus.REJECTED
+        except Exception:
+            # the job decides between a retry (APPROVED) and giving up (REJECTED)
+            self.db.rollback()
+            raise
+
+    def _stream_chunks(
+        self,
+        file_id: int,
+        case_id: int,
+        abs_path: str,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ):
+        """
+        pages -> chunks -> embeddings -> rows as one pipeline of generators.
+
+        Pages are read as the chunker asks for them, at most
+        EMBEDDING_CONCURRENCY embedding batches are in flight, and rows are
+        committed every INGESTION_COMMIT_EVERY_CHUNKS chunks, so memory stays
+        flat whatever the size of the document. Committed chunks are
+        searchable right away; the file turns PROCESSED after the last one.
+        Each row's document_metadata holds the chunk's pages and character
+        offsets.
+        """
+        page_count = (pdf_page_count(abs_path) if abs_path.lower().endswith(".pdf") else 1) or 1
+        pages_read = 0
+
+        def pages():
+            nonlocal pages_read
+            for page in iter_text_pages_from_file_path(abs_path):
+                pages_read += 1
+                yield page
+
+        profile = get_chunk_profile(settings.CHUNK_PROFILE)
+        # metadata of chunks handed to the embedder, waiting for their vectors
+        in_flight = deque()
+
+        def chunks():
+            for chunk in iter_structured_chunks(pages(), profile):
+                in_flight.append(json.dumps(chunk.metadata()))
+                yield chunk.text
+
+        def batches():
+            for batch, vectors in self.embedding_service.iter_embeddings(chunks()):
+                yield batch, vectors, [in_flight.popleft() for _ in batch]
+
+        def estimate_total(done: int) -> int:
+            # chunks per page so far, extrapolated to the pages still unread
+            return max(done, math.ceil(done * page_count / max(pages_read, 1)))
+
+        result = self._write_chunks(file_id, case_id, batches(), progress, estimate_total)
+        if result is None:
+            raise HTTPException(422, "No text found")
+        return result
+
+    def _write_chunks(
+        self,
+        file_id: int,
+        case_id: int,
+        batches: Iterable[Tuple[List[str], Sequence, List[Optional[str]]]],
+        progress: Optional[Callable[[int, int], None]] = None,
+        estimate_total: Optional[Callable[[int], int]] = None,
+    ) -> Optional[dict]:
+        """
+        Insert (texts, vectors, document_metadata) batches for a PROCESSING
+        file, committing every INGESTION_COMMIT_EVERY_CHUNKS rows, then mark
+        it PROCESSED. Returns None when there was nothing to insert.
+        """
+        Embedding = models.embedding.Embedding
+        first_id = None
+        done = 0
+        uncommitted = 0
+
+        for texts, vectors, metadata in batches:
+            rows = [
+                Embedding(
+                    file_id=file_id,
+                    chunk_text=chunk,
+                    document_metadata=meta,
+                    **embedding_columns(vector, settings.EMBEDDING_STORAGE_MODE),
+                )
+                for chunk, vector, meta in zip(texts, vectors, metadata)
+            ]
+            self.db.add_all(rows)
+            self.db.flush()
+            self.lexical_index.index_chunks(case_id, [(emb.id, chunk) for emb, chunk in zip(rows, texts)])
+
+            first_id = first_id or rows[0].id
+            done += len(rows)
+            uncommitted += len(rows)
+
+            if uncommitted >= settings.INGESTION_COMMIT_EVERY_CHUNKS:
+                if self._lock_own_chunks(file_id, first_id, done) is None:
+                    return {"processed": False, "message": "Processed elsewhere"}
                 self.db.commit()
-                return {"message": "No text found"}
+                uncommitted = 0
 
-            chunks = chunk_text(text, chunk_size=800, overlap=100)
-            embeddings = self.embedding_service.create_embeddings_for_chunks(chunks)
+            if progress is not None:
+                progress(done, estimate_total(done) if estimate_total else done)
 
-            for chunk, vector in zip(chunks, embeddings):
-                emb = models.embedding.Embedding(
-                    file_id=file.id,
-                    chunk_text=chunk,
-                    vector=vector,
-                )
-                self.db.add(emb)
+        if done == 0:
+            return None
 
-            file.status = FileStatus.PROCESSED
-            file.processed_at = datetime.utcnow()
+        file = self._lock_own_chunks(file_id, first_id, done)
+        if file is None:
+            return {"processed": False, "message": "Processed elsewhere"}
 
-            self.db.commit()
+        file.status = FileStatus.PROCESSED
+        file.processed_at = datetime.utcnow()
+        self.db.commit()
 
-            return {"processed": True}
+        if progress is not None:
+            progress(done, done)
 
-        except Exception as e:
-            self.db.rollback()
-            file.status = FileStatus.REJECTED
-            self.db.commit()
-            raise e
+        # the rows went in batch by batch; reload the case on next use
+        vector_cache.invalidate(case_id)
+        answer_cache.invalidate(case_id)
+
+        return {"processed": True}
+
+    def _lock_own_chunks(self, file_id: int, first_id: int, done: int) -> Optional[CaseFile]:
+        """
+        Lock the PROCESSING file before committing chunks, and make sure the
+        file's rows are still exactly the ones this run wrote: a worker that
+        took over an expired lease deletes them and starts again. Rolls back
+        and returns None when they're not.
+        """
+        Embedding = models.embedding.Embedding
+        file = (
+            self.db.query(CaseFile)
+            .filter(CaseFile.id == file_id)
+            .with_for_update()
+            .first()
+        )
+
+        if file is not None and file.status == FileStatus.PROCESSING:
+            count, min_id = (
+                self.db.query(func.count(Embedding.id), func.min(Embedding.id))
+                .filter(Embedding.file_id == file_id)
+                .one()
+            )
+            if count == done and min_id == first_id:
+                return file
+
+        self.db.rollback()
+        logger.warning("file %s: taken over by another worker, abandoning this run", file_id)
+        return None
+
+    def _delete_chunks(self, file_id: int):
+        """
+        Remove a file's chunk rows (postings go with them). Runs inside the
+        caller's transaction.
+        """
+        Embedding = models.embedding.Embedding
+        deleted = (
+            self.db.query(Embedding)
+            .filter(Embedding.file_id == file_id)
+            .delete(synchronize_session=False)
+        )
+        if deleted:
+            logger.info("file %s: deleted %d chunks of an unfinished run", file_id, deleted)
+
+    def _find_trained_copy(self, file: CaseFile) -> Optional[CaseFile]:
+        """
+        Another processed file with the same bytes, whose chunks can be reused.
+        """
+        if not file.content_hash:
+            return None
+
+        return (
+            self.db.query(CaseFile)
+            .filter(
+                CaseFile.content_hash == file.content_hash,
+                CaseFile.id != file.id,
+                CaseFile.status == FileStatus.PROCESSED,
+                CaseFile.embeddings.any(),
+            )
+            .order_by(CaseFile.processed_at.desc())
+            .first()
+        )
+
+    def _clone_embeddings(
+        self,
+        file_id: int,
+        case_id: int,
+        source: CaseFile,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ):
+        """
+        Train a duplicate upload by copying the chunks and vectors of `source`
+        instead of parsing and embedding the file again. Rows are read and
+        written INGESTION_COMMIT_EVERY_CHUNKS at a time, like _stream_chunks.
+        """
+        Embedding = models.embedding.Embedding
+        batch_size = settings.INGESTION_COMMIT_EVERY_CHUNKS
+        source_rows = (
+            select(
+                Embedding.chunk_text,
+                Embedding.vector,
+                Embedding.vector_blob,
+                Embedding.vector_scale,
+                Embedding.document_metadata,
+            )
+            .where(Embedding.file_id == source.id)
+            .order_by(Embedding.id)
+            .execution_options(yield_per=batch_size)
+        )
+
+        # read through a session of its own: the server-side cursor behind
+        # yield_per would not survive the commits made while writing
+        source_db = SessionLocal()
+        try:
+            total = (
+                source_db.query(func.count(Embedding.id))
+                .filter(Embedding.file_id == source.id)
+                .scalar()
+            )
+
+            def batches():
+                for rows in source_db.execute(source_rows).partitions():
+                    yield (
+                        [r.chunk_text for r in rows],
+                        # re-encoded in the current storage mode, whatever mode the source used
+                        [row_vector(r.vector, r.vector_blob, r.vector_scale) for r in rows],
+                        [r.document_metadata for r in rows],
+                    )
+
+            result = self._write_chunks(file_id, case_id, batches(), progress, lambda done: total)
+
+            texts = source_db.execute(
+                select(Embedding.chunk_text)
+                .where(Embedding.file_id == source.id)
+                .order_by(Embedding.id)
+                .execution_options(yield_per=batch_size)
+            ).scalars()
+            calls_saved = sum(
+                1 for _ in iter_batches(texts, settings.EMBEDDING_BATCH_SIZE, settings.EMBEDDING_BATCH_MAX_TOKENS)
+            )
+        finally:
+            source_db.close()
+
+        if result is None:
+            # the source lost its chunks in the meantime; the retry embeds the file itself
+            raise RuntimeError(f"chunks of identical file {source.id} disappeared while copying")
+
+        metrics.increment("embedding_calls_saved_total", calls_saved)
+        metrics.increment("embedding_chunks_reused_total", total)
+        logger.info(
+            "file %s: reused %d chunks of identical file %s (%d embedding calls saved)",
+            file_id, total, source.id, calls_saved,
+        )
+        return {**result, "reused_from_file_id": source.id, "embedding_calls_saved": calls_saved}
 
     # -------------------------
     # GET FILE
@@ -252,4 +537,11 @@ class FileService:
             headers={
                 "Content-Disposition": f'{disposition}; filename="{file.filename}"'
             },
-        )
\ No newline at end of file
+        )
+
+
+@event.listens_for(CaseFile, "after_delete")
+def _invalidate_case_caches(mapper, connection, target):
+    # deleted chunks must stop showing up in cached answers and indexes
+    vector_cache.invalidate(target.case_id)
+    answer_cache.invalidate(target.case_id)
@@ -0,0 +1,266 @@
+# app/services/ingestion_service.py
+"""
+Postgres-backed queue of file training jobs.
+
+The API enqueues a job and returns its id; app.worker claims jobs with
+SELECT ... FOR UPDATE SKIP LOCKED, holds them under a lease it renews from a
+heartbeat thread, and reports progress (chunks embedded / total) through the
+same heartbeat. A job whose lease lapses (worker crashed or was killed) is
+claimed again, up to INGESTION_MAX_ATTEMPTS attempts.
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, func, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.case_file import CaseFile, FileStatus
+from app.models.embedding import Embedding
+from app.models.ingestion_job import IngestionJob, JobStatus
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = (JobStatus.QUEUED, JobStatus.RUNNING)
+
+
+class IngestionService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    # -------------------------
+    # API side
+    # -------------------------
+    def enqueue(self, file_id: int, extract_metadata: bool = False) -> IngestionJob:
+        """
+        Queue training of an APPROVED file. A file has at most one live job;
+        asking again returns that job.
+        """
+        job = self.get_active_job(file_id)
+        if job is None:
+            job = IngestionJob(file_id=file_id, extract_metadata=extract_metadata)
+            self.db.add(job)
+            try:
+                self.db.commit()
+            except IntegrityError:
+                # a concurrent request queued it first (uq_ingestion_jobs_active_file)
+                self.db.rollback()
+                job = self.get_active_job(file_id)
+            else:
+                self.db.refresh(job)
+                return job
+
+        if extract_metadata and not job.extract_metadata:
+            job.extract_metadata = True
+            self.db.commit()
+        return job
+
+    def get_job(self, job_id: int) -> Optional[IngestionJob]:
+        return self.db.query(IngestionJob).filter(IngestionJob.id == job_id).first()
+
+    def get_active_job(self, file_id: int) -> Optional[IngestionJob]:
+        return (
+            self.db.query(IngestionJob)
+            .filter(IngestionJob.file_id == file_id, IngestionJob.status.in_(ACTIVE_STATUSES))
+            .first()
+        )
+
+    def trained_cases_since(self, since: datetime) -> Tuple[List[int], datetime]:
+        """
+        Cases with a job that finished after `since`, and the cursor to pass
+        next time. Used by API processes to drop their in-memory caches (a
+        failed job may have had chunks searchable for a while).
+        """
+        rows = (
+            self.db.query(CaseFile.case_id, func.max(IngestionJob.finished_at))
+            .join(IngestionJob, IngestionJob.file_id == CaseFile.id)
+            .filter(
+                IngestionJob.status.in_((JobStatus.SUCCEEDED, JobStatus.FAILED)),
+                IngestionJob.finished_at > since,
+            )
+            .group_by(CaseFile.case_id)
+            .all()
+        )
+        cursor = max([since] + [finished_at for _, finished_at in rows])
+        return [case_id for case_id, _ in rows], cursor
+
+    # -------------------------
+    # Worker side
+    # -------------------------
+    def claim(self, worker_id: str) -> Optional[IngestionJob]:
+        """
+        Take the oldest queued job, or a running one whose lease expired and
+        that has attempts left. Expired jobs without attempts left (their
+        file keeps killing the worker before fail() runs) are failed here.
+        """
+        now = datetime.utcnow()
+        self._fail_exhausted(now)
+
+        job = (
+            self.db.query(IngestionJob)
+            .filter(
+                or_(
+                    IngestionJob.status == JobStatus.QUEUED,
+                    and_(
+                        IngestionJob.status == JobStatus.RUNNING,
+                        IngestionJob.lease_expires_at < now,
+                        IngestionJob.attempts < settings.INGESTION_MAX_ATTEMPTS,
+                    ),
+                )
+            )
+            .order_by(IngestionJob.id)
+            .with_for_update(skip_locked=True)
+            .first()
+        )
+
+        if job is None:
+            self.db.commit()
+            return None
+
+        if job.status == JobStatus.RUNNING:
+            logger.warning("ingestion job %s: lease of %s expired, reclaiming", job.id, job.locked_by)
+
+        job.status = JobStatus.RUNNING
+        job.locked_by = worker_id
+        job.lease_expires_at = now + timedelta(seconds=settings.INGESTION_LEASE_SECONDS)
+        job.heartbeat_at = now
+        job.attempts += 1
+        job.started_at = job.started_at or now
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def heartbeat(self, job_id: int, worker_id: str, chunks_done: int, chunks_total: Optional[int]) -> bool:
+        """
+        Renew the lease and store progress. False when the job is no longer ours.
+        """
+        now = datetime.utcnow()
+        updated = (
+            self.db.query(IngestionJob)
+            .filter(
+                IngestionJob.id == job_id,
+                IngestionJob.locked_by == worker_id,
+                IngestionJob.status == JobStatus.RUNNING,
+            )
+            .update(
+                {
+                    IngestionJob.lease_expires_at: now + timedelta(seconds=settings.INGESTION_LEASE_SECONDS),
+                    IngestionJob.heartbeat_at: now,
+                    IngestionJob.chunks_done: chunks_done,
+                    IngestionJob.chunks_total: chunks_total,
+                },
+                synchronize_session=False,
+            )
+        )
+        self.db.commit()
+        return updated == 1
+
+    def complete(self, job_id: int, worker_id: str, result: Optional[dict] = None):
+        job = self._owned_job(job_id, worker_id)
+        if job is None:
+            return
+
+        result = result or {}
+        job.reused_from_file_id = result.get("reused_from_file_id")
+        job.embedding_calls_saved = result.get("embedding_calls_saved", 0)
+
+        job.status = JobStatus.SUCCEEDED
+        job.finished_at = datetime.utcnow()
+        job.locked_by = None
+        job.lease_expires_at = None
+        if job.chunks_total is not None:
+            job.chunks_done = job.chunks_total
+        self.db.commit()
+
+    def fail(self, job_id: int, worker_id: str, error: Exception):
+        """
+        Requeue the job, or give up on it (and reject the file) when the error
+        is permanent or the attempts are used up.
+        """
+        job = self._owned_job(job_id, worker_id)
+        if job is None:
+            return
+
+        # HTTPExceptions are the file's fault (missing, no text, wrong state)
+        permanent = isinstance(error, HTTPException)
+        message = error.detail if isinstance(error, HTTPException) else f"{type(error).__name__}: {error}"
+
+        if not permanent and job.attempts < settings.INGESTION_MAX_ATTEMPTS:
+            file = self._lock_file(job.file_id)
+            job.error = str(message)[:2000]
+            job.locked_by = None
+            job.lease_expires_at = None
+            job.status = JobStatus.QUEUED
+            if file is not None and file.status == FileStatus.PROCESSING:
+                file.status = FileStatus.APPROVED
+                # chunks committed before the failure; the retry starts from scratch
+                self.db.query(Embedding).filter(Embedding.file_id == file.id).delete(synchronize_session=False)
+        else:
+            self._give_up(job, message)
+
+        self.db.commit()
+
+    def _fail_exhausted(self, now: datetime):
+        """
+        Fail RUNNING jobs whose lease expired on their last attempt.
+        """
+        jobs = (
+            self.db.query(IngestionJob)
+            .filter(
+                IngestionJob.status == JobStatus.RUNNING,
+                IngestionJob.lease_expires_at < now,
+                IngestionJob.attempts >= settings.INGESTION_MAX_ATTEMPTS,
+            )
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        for job in jobs:
+            logger.error(
+                "ingestion job %s: lease of %s expired on attempt %d, giving up",
+                job.id, job.locked_by, job.attempts,
+            )
+            self._give_up(job, f"Worker lost the job on attempt {job.attempts} (crashed or killed)")
+
+        if jobs:
+            self.db.commit()
+
+    def _give_up(self, job: IngestionJob, message):
+        """
+        Mark the job FAILED and reject its file, dropping any chunks committed
+        before the failure. The caller commits.
+        """
+        file = self._lock_file(job.file_id)
+
+        job.error = str(message)[:2000]
+        job.locked_by = None
+        job.lease_expires_at = None
+        job.status = JobStatus.FAILED
+        job.finished_at = datetime.utcnow()
+
+        if file is not None and file.status != FileStatus.PROCESSED:
+            file.status = FileStatus.REJECTED
+            self.db.query(Embedding).filter(Embedding.file_id == file.id).delete(synchronize_session=False)
+
+    def _lock_file(self, file_id: int) -> Optional[CaseFile]:
+        return (
+            self.db.query(CaseFile)
+            .filter(CaseFile.id == file_id)
+            .with_for_update()
+            .first()
+        )
+
+    def _owned_job(self, job_id: int, worker_id: str) -> Optional[IngestionJob]:
+        job = (
+            self.db.query(IngestionJob)
+            .filter(IngestionJob.id == job_id)
+            .with_for_update()
+            .first()
+        )
+        if job is None or job.locked_by != worker_id:
+            # lease lost to another worker; its outcome wins
+            self.db.rollback()
+            return None
+        return job
@@ -0,0 +1,166 @@
+# app/services/intent_classifier.py
+import asyncio
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.vector_cache import normalize_rows
+from app.services.embedding_service import EmbeddingService
+
+CHAT_INTENTS = ("GREETING", "MEMORY", "FOLLOW_UP", "QUESTION")
+
+# same examples as the LLM classification prompt, plus typical case questions
+INTENT_EXAMPLES: Dict[str, List[str]] = {
+    "GREETING": [
+        "hello",
+        "hi",
+        "good morning",
+        "how are you",
+    ],
+    "MEMORY": [
+        "what was my previous message",
+        "what did i ask before",
+        "what was my first question",
+        "what did you tell me",
+    ],
+    "FOLLOW_UP": [
+        "explain this",
+        "tell this in short",
+        "make it shorter",
+        "simplify this",
+        "can you explain that",
+        "what do you mean",
+        "summarize it shortly",
+        "tell me briefly",
+    ],
+    "QUESTION": [
+        "when is the next hearing",
+        "who is the judge in this case",
+        "what evidence was filed",
+        "what are the deadlines in this case",
+        "who are the parties involved",
+        "summarize the case documents",
+    ],
+}
+
+_GREETING_RE = re.compile(
+    r"^(hi|hello|hey|hi there|hello there|good (morning|afternoon|evening)|"
+    r"how are you( doing)?|thanks|thank you|bye|goodbye)[\s!.,?]*$"
+)
+_MEMORY_RE = re.compile(
+    r"\b(my|the) (previous|last|first|earlier) (message|question)\b|"
+    r"\bwhat (did|have) (i|you) (ask|asked|say|said|tell|told)\b"
+)
+_FOLLOW_UP_RE = re.compile(
+    r"^(can you |could you |please )?(explain|simplify|shorten|summari[sz]e|elaborate on|rephrase)"
+    r"( (this|that|it))?( (in short|shortly|briefly|more))?[\s!.,?]*$|"
+    r"^(tell me briefly|make it shorter|what do you mean)[\s!.,?]*$"
+)
+
+
+class IntentClassifier:
+    """
+    Chat intent without an LLM round trip: exact-ish rules first, then the
+    nearest intent centroid over embeddings of INTENT_EXAMPLES.
+
+    `classify` returns (intent, confidence, source); intent is None when the
+    classifier is not confident and the caller should ask the LLM.
+    """
+
+    def __init__(self, examples: Dict[str, List[str]]):
+        self.examples = examples
+        self._labels: List[str] = []
+        self._centroids: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+        self.rule_hits = 0
+        self.centroid_hits = 0
+        self.fallbacks = 0
+
+    def example_texts(self) -> List[str]:
+        return [text for texts in self.examples.values() for text in texts]
+
+    async def classify(
+        self,
+        question: str,
+        embedding_service: EmbeddingService
+    ) -> Tuple[Optional[str], float, str]:
+        intent = self._match_rules(question)
+        if intent is not None:
+            return self._record(intent, 1.0, "rule")
+
+        if self._centroids is None:
+            await self._build_centroids(embedding_service)
+
+        # the RAG path embeds the same text again -> query-embedding cache hit
+        question_vector = await embedding_service.embed_query_async(question)
+        sims = self._centroids @ normalize_rows(question_vector)[0]
+
+        order = np.argsort(-sims)
+        best = float(sims[order[0]])
+        margin = best - float(sims[order[1]]) if sims.shape[0] > 1 else best
+
+        if best >= settings.INTENT_MIN_SIMILARITY and margin >= settings.INTENT_MIN_MARGIN:
+            return self._record(self._labels[int(order[0])], best, "centroid")
+
+        return self._record(None, best, "llm")
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.rule_hits + self.centroid_hits + self.fallbacks
+            confident = self.rule_hits + self.centroid_hits
+            return {
+                "classified": total,
+                "rule_hits": self.rule_hits,
+                "centroid_hits": self.centroid_hits,
+                "llm_fallbacks": self.fallbacks,
+                "confident_ratio": (confident / total) if total else 0.0,
+            }
+
+    # -------------------------
+    # Internals
+    # -------------------------
+    def _match_rules(self, question: str) -> Optional[str]:
+        text = " ".join(question.lower().split())
+        if _GREETING_RE.match(text):
+            return "GREETING"
+        if _MEMORY_RE.search(text):
+            return "MEMORY"
+        if _FOLLOW_UP_RE.match(text):
+            return "FOLLOW_UP"
+        return None
+
+    async def _build_centroids(self, embedding_service: EmbeddingService):
+        labels = []
+        centroids = []
+
+        for intent, texts in self.examples.items():
+            vectors = await asyncio.gather(
+                *(embedding_service.embed_query_async(t) for t in texts)
+            )
+            centroids.append(normalize_rows(vectors).mean(axis=0))
+            labels.append(intent)
+
+        matrix = normalize_rows(np.vstack(centroids))
+        with self._lock:
+            self._labels = labels
+            self._centroids = matrix
+
+    def _record(self, intent: Optional[str], confidence: float, source: str):
+        with self._lock:
+            if source == "rule":
+                self.rule_hits += 1
+            elif source == "centroid":
+                self.centroid_hits += 1
+            else:
+                self.fallbacks += 1
+
+        metrics.increment("chat_intent_total", source=source, intent=intent or "UNKNOWN")
+        return intent, confidence, source
+
+
+intent_classifier = IntentClassifier(INTENT_EXAMPLES)
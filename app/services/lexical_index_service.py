@@ -0,0 +1,140 @@
+# app/services/lexical_index_service.py
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import bindparam, func, insert
+from sqlalchemy.orm import Session
+
+from app import models
+from app.utils.lexical import bm25_scores, posting_rows, query_terms
+
+Embedding = models.embedding.Embedding
+CaseFile = models.case_file.CaseFile
+ChunkPosting = models.chunk_posting.ChunkPosting
+
+
+class LexicalIndexService:
+    """
+    Per-case BM25 inverted index persisted in `chunk_postings`.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # -------------------------
+    # Indexing (incremental, per processed file)
+    # -------------------------
+    def index_chunks(self, case_id: int, chunks: Iterable[Tuple[int, str]]):
+        """
+        Add postings for (embedding_id, chunk_text) pairs.
+        Runs inside the caller's transaction; the caller commits.
+        """
+        postings = []
+        lengths = []
+
+        for embedding_id, length, rows in posting_rows(case_id, chunks):
+            postings.extend(rows)
+            lengths.append({"_id": embedding_id, "_len": length})
+
+        if lengths:
+            self.db.execute(
+                Embedding.__table__.update()
+                .where(Embedding.__table__.c.id == bindparam("_id"))
+                .values(token_count=bindparam("_len")),
+                lengths,
+            )
+
+        if postings:
+            self.db.execute(insert(ChunkPosting), postings)
+
+    # -------------------------
+    # Scoring
+    # -------------------------
+    def score_case(
+        self,
+        case_id: int,
+        question: str,
+        embedding_ids: Optional[Sequence[int]] = None,
+    ) -> Dict[int, float]:
+        """
+        BM25 score of every chunk in the case that shares a term with the question,
+        scaled to [0, 1] by the best score. Chunks missing from the result score 0.
+        With `embedding_ids` only those chunks are scored (e.g. the vector search
+        candidates); IDF and length normalization still use the whole case.
+        """
+        terms = query_terms(question)
+        if not terms:
+            return {}
+
+        n_docs, avg_len = (
+            self.db.query(func.count(Embedding.id), func.avg(Embedding.token_count))
+            .join(CaseFile)
+            .filter(
+                CaseFile.case_id == case_id,
+                Embedding.token_count.isnot(None),
+            )
+            .one()
+        )
+        if not n_docs:
+            return {}
+
+        query = (
+            self.db.query(
+                ChunkPosting.embedding_id,
+                ChunkPosting.term,
+                ChunkPosting.tf,
+                Embedding.token_count,
+            )
+            .join(Embedding, Embedding.id == ChunkPosting.embedding_id)
+            .filter(
+                ChunkPosting.case_id == case_id,
+                ChunkPosting.term.in_(terms),
+            )
+        )
+        doc_freq = None
+        if embedding_ids is not None:
+            if not embedding_ids:
+                return {}
+            query = query.filter(ChunkPosting.embedding_id.in_(embedding_ids))
+
+            # document frequencies over the case, not just the scored chunks
+            counts = dict(
+                self.db.query(ChunkPosting.term, func.count())
+                .filter(
+                    ChunkPosting.case_id == case_id,
+                    ChunkPosting.term.in_(terms),
+                )
+                .group_by(ChunkPosting.term)
+                .all()
+            )
+            doc_freq = np.array([counts.get(t, 0) for t in terms], dtype=np.int64)
+
+        rows = query.all()
+        if not rows:
+            return {}
+
+        emb_ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+        term_pos = {t: i for i, t in enumerate(terms)}
+        term_index = np.fromiter((term_pos[r[1]] for r in rows), dtype=np.int64, count=len(rows))
+        tf = np.fromiter((r[2] for r in rows), dtype=np.float32, count=len(rows))
+        doc_len = np.fromiter((r[3] or 0 for r in rows), dtype=np.float32, count=len(rows))
+
+        slots, doc_index = np.unique(emb_ids, return_inverse=True)
+        scores = bm25_scores(
+            doc_index=doc_index,
+            term_index=term_index,
+            tf=tf,
+            doc_length=doc_len,
+            n_docs=int(n_docs),
+            avg_doc_length=float(avg_len or 0.0),
+            n_slots=slots.shape[0],
+            doc_freq=doc_freq,
+        )
+
+        top = float(scores.max()) if scores.size else 0.0
+        if top <= 0:
+            return {}
+
+        scores /= top
+        return dict(zip(slots.tolist(), scores.tolist()))
+
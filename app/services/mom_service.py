@@ -47,7 +47,8 @@ Transcript:
                 {"role": "system", "content": "You clean legal transcripts."},
                 {"role": "user", "content": prompt}
             ],
-            temperature=0.2
+            temperature=0.2,
+            call_site="mom_clean"
         )
 
         return response.choices[0].message.content.strip()
@@ -82,7 +83,8 @@ Transcript:
                 {"role": "system", "content": "You generate professional MOM documents."},
                 {"role": "user", "content": prompt}
             ],
-            temperature=0.3
+            temperature=0.3,
+            call_site="mom_generate"
         )
 
         return response["choices"][0]["message"]["content"].strip()
\ No newline at end of file
@@ -3,54 +3,70 @@ import os
 import tempfile
 from typing import Any, Dict, Optional, List
 from datetime import date, datetime
+import asyncio
 import json
 import re
 import logging
-from app.core.azure_openai import client
+import time
+from app.core.azure_openai import client, async_client
 from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
 from app.schemas import file
 from app.schemas.qa import SpeechResponse
-import numpy as np
 from sqlalchemy.orm import Session
 from app.services.embedding_service import EmbeddingService
+from app.services.retrieval_service import RetrievalService
+from app.services.lexical_index_service import LexicalIndexService
+from app.services.intent_classifier import CHAT_INTENTS, intent_classifier
+from app.services.chat_history_service import ChatHistoryService
 from pydub import AudioSegment
 import azure.cognitiveservices.speech as speechsdk
 from app.core.config import settings
+from app.core.answer_cache import answer_cache
+from app.core.metrics import metrics
+from app.core.voice_prefetch import voice_prefetch
+from app.db.session import SessionLocal
+from app.utils.context_packer import pack_rag_prompt
 from app import models
 
 logger = logging.getLogger(__name__)
 
+# generic summary query to find informative chunks
+METADATA_QUERY = "case parties court judge lawyer filing date evidence next hearing deadline attorney"
+
+# fixed query texts whose embeddings are computed once at startup
+STATIC_QUERIES = [METADATA_QUERY]
+
+
+async def _timed(stage: str, func, *args):
+    """
+    Await func(*args) and record the stage duration as chat_stage_seconds{stage=...}.
+    The coroutine is only created once the stage runs, and cancelled stages
+    are not recorded.
+    """
+    started = time.perf_counter()
+    result = await func(*args)
+    metrics.observe("chat_stage_seconds", time.perf_counter() - started, stage=stage)
+    return result
+
+
+def _consume_result(task: "asyncio.Future"):
+    # abandoned speculative work: swallow its outcome instead of logging
+    # "exception was never retrieved"
+    if not task.cancelled():
+        task.exception()
+
 
 class QAService:
     def __init__(self, db: Session):
         self.db = db
+        self.retrieval = RetrievalService(db)
+        self.lexical = LexicalIndexService(db)
+        self.embedding_service = EmbeddingService()
 
     # -------------------------
     # Utilities
     # -------------------------
-    def _cos_similarities(self, query_vector: List[float], vectors: List[List[float]]) -> List[float]:
-        """
-        Compute cosine similarities between query_vector and each vector in vectors.
-        Handles zero-length vectors safely by using a tiny epsilon.
-        """
-        a = np.array(vectors, dtype=float)
-        q = np.array(query_vector, dtype=float)
-
-        # tiny epsilon to avoid division by zero
-        eps = 1e-10
-        a_norms = np.linalg.norm(a, axis=1, keepdims=True)
-        a_norms[a_norms == 0] = eps
-        q_norm = np.linalg.norm(q)
-        if q_norm == 0:
-            q_norm = eps
-
-        a_norm = a / a_norms
-        q_norm = q / q_norm
-
-        sims = (a_norm @ q_norm).tolist()
-        return sims
-
-    
     def _clean_question(self, text: str) -> str:
         """
         Extract the most meaningful question from a transcript.
@@ -83,82 +99,74 @@ class QAService:
     # Q/A with RAG
     # -------------------------
     def _get_chat_history(self, session_id: int):
-        recent_msgs = (
-            self.db.query(models.ChatMessage)
-            .filter(models.ChatMessage.session_id == session_id)
-            .order_by(models.ChatMessage.created_at.asc())
-            .all()
-        )
-
-        history = []
-
-        for msg in recent_msgs:
-            history.append({
-                "role": msg.role,
-                "content": msg.content
-            })
-
-        return history
+        # summary + most recent turns within CHAT_HISTORY_TOKEN_BUDGET
+        return ChatHistoryService(self.db).load(session_id)
     
-    def _generate_rag_answer(
+    def _select_rag_chunks(
         self,
         case_id: int,
         question: str,
-        conversation_history: Optional[List[Dict[str, str]]] = None
+        question_vector
     ):
-        embedding_response = client.embeddings.create(
-            model=settings.AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
-            input=question,
-        )
-
-        question_vector = embedding_response.data[0].embedding
-
-        embeddings = (
-            self.db.query(models.embedding.Embedding)
-            .join(models.case_file.CaseFile)
-            .filter(models.case_file.CaseFile.case_id == case_id)
-            .all()
-        )
+        """
+        Rank the case's chunks for a question and load the winners' text.
+        Returns (early_result, top_ids, chunks); early_result is a final answer
+        dict when there is nothing to send to the model.
+        """
+        if self.retrieval.fused_search_enabled:
+            candidates = self.retrieval.search_case_fused(
+                case_id,
+                question_vector,
+                question,
+                limit=settings.RAG_CANDIDATE_POOL
+            )
+        else:
+            candidates = self.retrieval.search_case(
+                case_id,
+                question_vector,
+                limit=settings.RAG_CANDIDATE_POOL
+            )
 
-        if not embeddings:
+        if not candidates:
             return {
                 "answer": "There are no case files for this case yet.",
                 "source_chunks": []
-            }
-
-        vectors = [e.vector for e in embeddings]
-        similarities = self._cos_similarities(question_vector, vectors)
+            }, [], []
 
         TOP_K = 4
-        keywords = set(question.lower().split())
-
         scores = []
 
-        for i, emb in enumerate(embeddings):
-            sim = similarities[i]
-            text = emb.chunk_text.lower()
-
-            keyword_score = sum(
-                1 for k in keywords if k in text
+        if self.retrieval.fused_search_enabled:
+            # already fused with ts_rank inside Postgres
+            scores = [(i, cand["rrf"]) for i, cand in enumerate(candidates)]
+        else:
+            lexical_scores = self.lexical.score_case(
+                case_id,
+                question,
+                embedding_ids=[cand["id"] for cand in candidates]
             )
 
-            final_score = sim + (0.05 * keyword_score)
+            for i, cand in enumerate(candidates):
+                sim = cand["similarity"]
+                keyword_score = lexical_scores.get(cand["id"], 0.0)
 
-            scores.append((i, final_score))
+                final_score = sim + (settings.RAG_LEXICAL_WEIGHT * keyword_score)
+
+                scores.append((i, final_score))
 
         SIM_THRESHOLD = 0.20
 
         filtered = [
             (i, score)
             for i, score in scores
-            if similarities[i] > SIM_THRESHOLD
+            if candidates[i]["similarity"] > SIM_THRESHOLD
         ]
 
         if not filtered:
             return {
                 "answer": "There is nothing related to this question in case files.",
                 "source_chunks": []
-            }
+            }, [], []
 
         top_indices = [
             i for i, _ in sorted(
@@ -168,84 +176,231 @@ class QAService:
             )[:TOP_K]
         ]
 
-        candidate_chunks = [
-            embeddings[i].chunk_text
+        # only the winners' text is ever loaded
+        chunk_texts = self.retrieval.fetch_chunk_texts(
+            [candidates[i]["id"] for i in top_indices]
+        )
+        top_ids = [
+            candidates[i]["id"]
             for i in top_indices
+            if candidates[i]["id"] in chunk_texts
         ]
 
-        rag_context = "\n\n".join(
-            f"[SOURCE {idx+1}]\n{chunk}"
-            for idx, chunk in enumerate(candidate_chunks)
-        )
-
-        messages = [
-            {
-                "role": "system",
-                "content": (
-                    "You are a helpful legal AI assistant.\n"
-                    "Use previous conversation history for conversational questions.\n"
-                    "Use case file context for legal/case-specific questions.\n"
-                    "If user asks about earlier conversation, use chat history.\n"
-                    "If user asks about case facts, use case context.\n"
-                    "Do not invent facts."
-                )
-            }
+        candidate_chunks = [
+            chunk_texts[emb_id]
+            for emb_id in top_ids
         ]
 
-        if conversation_history:
-            messages.extend(conversation_history)
+        return None, top_ids, candidate_chunks
 
-        messages.append({
-            "role": "system",
-            "content": f"Case file context:\n{rag_context}"
-        })
+    def _build_rag_messages(
+        self,
+        question: str,
+        candidate_chunks: List[str],
+        conversation_history: Optional[List[Dict[str, str]]] = None
+    ):
+        """
+        Prompt for a RAG answer within RAG_PROMPT_TOKEN_BUDGET.
+        Returns (messages, kept chunk indices, tokens per prompt section).
+        """
+        messages, kept, sections = pack_rag_prompt(
+            system_prompt=(
+                "You are a helpful legal AI assistant.\n"
+                "Use previous conversation history for conversational questions.\n"
+                "Use case file context for legal/case-specific questions.\n"
+                "If user asks about earlier conversation, use chat history.\n"
+                "If user asks about case facts, use case context.\n"
+                "Do not invent facts."
+            ),
+            question=question,
+            chunks=candidate_chunks,
+            history=conversation_history,
+            budget=settings.RAG_PROMPT_TOKEN_BUDGET,
+            min_chunk_tokens=settings.RAG_MIN_CHUNK_TOKENS,
+        )
 
-        messages.append({
-            "role": "user",
-            "content": question
-        })
+        for section, tokens in sections.items():
+            metrics.observe("rag_prompt_tokens", tokens, section=section)
+        logger.debug("RAG prompt tokens: %s", sections)
 
-        completion = client.chat.completions.create(
-            model=settings.AZURE_OPENAI_CHAT_DEPLOYMENT,
-            messages=messages,
-            max_tokens=300,
-            temperature=0,
+        return messages, kept, sections
+
+    # -------------------------
+    # Answer plans
+    # -------------------------
+    # Every answer path first resolves to a plan: either a final "result" that
+    # needs no model call, or a completion "request" plus its source chunks.
+    # A plan is then completed in one call or streamed token by token.
+
+    async def _retrieve_rag_context(
+        self,
+        case_id: int,
+        question: str,
+        own_session: bool = False,
+        question_vector=None
+    ) -> Dict[str, Any]:
+        """
+        Question embedding (unless given) and chunk ranking.
+        Returns {"result": ...} when no completion is needed, otherwise the
+        ranked chunks. With own_session the ranking uses a private DB session,
+        so the work can be abandoned (cancelled) without touching self.db.
+        """
+        if question_vector is None:
+            question_vector = await self.embedding_service.embed_query_async(question)
+
+        # DB-bound ranking runs off the event loop
+        early_result, top_ids, candidate_chunks = await run_in_threadpool(
+            self._select_rag_chunks_in_own_session if own_session else self._select_rag_chunks,
+            case_id,
+            question,
+            question_vector,
         )
+        if early_result is not None:
+            return {"result": early_result}
+
+        return {
+            "source_chunks": top_ids,
+            "chunks": candidate_chunks,
+        }
 
-        answer_text = completion.choices[0].message.content.strip()
+    def _select_rag_chunks_in_own_session(self, case_id: int, question: str, question_vector):
+        db = SessionLocal()
+        try:
+            return QAService(db)._select_rag_chunks(case_id, question, question_vector)
+        finally:
+            db.close()
+
+    def _rag_plan(
+        self,
+        case_id: int,
+        question: str,
+        context: Dict[str, Any],
+        conversation_history: Optional[List[Dict[str, str]]] = None
+    ) -> Dict[str, Any]:
+        if "result" in context:
+            return {"result": context["result"]}
+
+        messages, kept, _ = self._build_rag_messages(
+            question,
+            context["chunks"],
+            conversation_history
+        )
 
         return {
-            "answer": answer_text,
-            "source_chunks": [
-                embeddings[i].id for i in top_indices
-            ]
+            "request": {
+                "messages": messages,
+                "max_tokens": 300,
+                "call_site": "rag_answer",
+                "temperature": 0,
+            },
+            # only the chunks that fit the prompt count as sources
+            "source_chunks": [context["source_chunks"][i] for i in kept],
         }
-        
-    def answer_chat_question(
+
+    async def _plan_rag_answer(
         self,
         case_id: int,
         question: str,
-        session_id: int
-    ):
-        # ----------------------------------------
-        # 1. Clean question
-        # ----------------------------------------
-        question = self._clean_question(question).strip()
+        own_session: bool = False
+    ) -> Dict[str, Any]:
+        """
+        History-free RAG plan (voice). Only these answers go through the
+        answer cache: it is keyed by case + question, and chat answers are
+        shaped by the session's history, so they must not be served to
+        other sessions.
+        """
+        question_vector = await self.embedding_service.embed_query_async(question)
 
-        if not question:
-            return {
-                "answer": "Sorry, I didn't catch that.",
-                "source_chunks": []
-            }
+        if settings.ANSWER_CACHE_ENABLED:
+            cached = answer_cache.lookup(case_id, question_vector)
+            if cached is not None:
+                return {"result": cached}
 
-        # ----------------------------------------
-        # 2. Get previous chat history
-        # ----------------------------------------
-        history = self._get_chat_history(session_id)
+        context = await self._retrieve_rag_context(case_id, question, own_session, question_vector)
+        plan = self._rag_plan(case_id, question, context)
+        if settings.ANSWER_CACHE_ENABLED and "request" in plan:
+            plan["cache_key"] = (case_id, question_vector)
+        return plan
 
-        # ----------------------------------------
-        # 3. Intent classification
-        # ----------------------------------------
+    async def _complete_plan(self, plan: Dict[str, Any]) -> Dict[str, Any]:
+        if "result" in plan:
+            return plan["result"]
+
+        completion = await async_client.chat.completions.create(
+            model=settings.AZURE_OPENAI_CHAT_DEPLOYMENT,
+            **plan["request"]
+        )
+
+        return self._finish_plan(plan, completion.choices[0].message.content)
+
+    async def _stream_plan(self, plan: Dict[str, Any], endpoint: str, started: float):
+        """
+        Async generator of ("delta", text) events followed by one ("done", result).
+        Time-to-first-token is measured from `started`, i.e. the start of the request.
+        """
+        if "result" in plan:
+            result = plan["result"]
+            metrics.observe("answer_ttft_seconds", time.perf_counter() - started, endpoint=endpoint)
+            yield "delta", result["answer"]
+            yield "done", result
+            return
+
+        stream = await async_client.chat.completions.create(
+            model=settings.AZURE_OPENAI_CHAT_DEPLOYMENT,
+            stream=True,
+            **plan["request"]
+        )
+
+        parts = []
+        async for chunk in stream:
+            # Azure sends a choice-less content-filter chunk first, and the
+            # usage chunk (stream_options, see instrumented_openai) is last
+            if not chunk.choices:
+                continue
+
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+
+            if not parts:
+                ttft = time.perf_counter() - started
+                metrics.observe("answer_ttft_seconds", ttft, endpoint=endpoint)
+                logger.info("%s answer first token after %.3fs", endpoint, ttft)
+
+            parts.append(delta)
+            yield "delta", delta
+
+        metrics.observe("answer_stream_seconds", time.perf_counter() - started, endpoint=endpoint)
+        yield "done", self._finish_plan(plan, "".join(parts))
+
+    def _finish_plan(self, plan: Dict[str, Any], answer_text: str) -> Dict[str, Any]:
+        result = {
+            "answer": (answer_text or "").strip(),
+            "source_chunks": plan.get("source_chunks", [])
+        }
+
+        if plan.get("cache_key") is not None:
+            answer_cache.store(*plan["cache_key"], result)
+
+        return result
+
+    def _save_assistant_message(self, session_id: int, answer: str):
+        try:
+            self.db.add(
+                models.ChatMessage(
+                    session_id=session_id,
+                    role="assistant",
+                    content=answer
+                )
+            )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+
+    # -------------------------
+    # Chat answers
+    # -------------------------
+    async def _classify_intent_with_llm(self, question: str) -> str:
         classify_prompt = f"""
     You are classifying chat intent.
 
@@ -291,7 +446,7 @@ class QAService:
     {question}
     """
 
-        classify_response = client.chat.completions.create(
+        classify_response = await async_client.chat.completions.create(
             model=settings.AZURE_OPENAI_CHAT_DEPLOYMENT,
             messages=[
                 {
@@ -300,59 +455,103 @@ class QAService:
                 }
             ],
             temperature=0,
-            max_tokens=20
+            max_tokens=20,
+            call_site="classify"
         )
 
         intent = classify_response.choices[0].message.content.strip().upper()
 
         # fallback safety
-        valid_intents = {
-            "GREETING",
-            "MEMORY",
-            "FOLLOW_UP",
-            "QUESTION"
-        }
-
-        if intent not in valid_intents:
+        if intent not in CHAT_INTENTS:
             intent = "QUESTION"
 
+        return intent
+
+    async def _classify_chat_intent(self, question: str) -> str:
+        intent = None
+        if settings.INTENT_CLASSIFIER_ENABLED:
+            intent, _, _ = await intent_classifier.classify(
+                question,
+                self.embedding_service
+            )
+
+        # not confident locally -> one classification completion
+        if intent is None:
+            intent = await self._classify_intent_with_llm(question)
+
+        return intent
+
+    async def _plan_chat_answer(
+        self,
+        case_id: int,
+        question: str,
+        session_id: int
+    ) -> Dict[str, Any]:
+        """
+        Plan for a chat message. "persist" tells whether the answer is stored
+        as the assistant's ChatMessage once it is complete.
+        """
         # ----------------------------------------
-        # 4. GREETING handling
+        # 1. Clean question
         # ----------------------------------------
-        if intent == "GREETING":
-            greeting_response = client.chat.completions.create(
-                model=settings.AZURE_OPENAI_CHAT_DEPLOYMENT,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "Reply naturally and conversationally to greetings. "
-                            "Be friendly and human-like."
-                        )
-                    },
-                    {
-                        "role": "user",
-                        "content": question
-                    }
-                ],
-                temperature=0.8,
-                max_tokens=50
-            )
+        question = self._clean_question(question).strip()
 
-            answer = greeting_response.choices[0].message.content.strip()
+        if not question:
+            return {
+                "result": {
+                    "answer": "Sorry, I didn't catch that.",
+                    "source_chunks": []
+                },
+                "persist": False
+            }
 
-            self.db.add(
-                models.ChatMessage(
-                    session_id=session_id,
-                    role="assistant",
-                    content=answer
-                )
-            )
-            self.db.commit()
+        # ----------------------------------------
+        # 2. History + 3. intent classification, run concurrently with
+        #    speculative retrieval that is dropped for non-QUESTION intents
+        # ----------------------------------------
+        history_task = asyncio.ensure_future(
+            _timed("history", run_in_threadpool, self._get_chat_history, session_id)
+        )
+        retrieval_task = asyncio.ensure_future(
+            _timed("retrieval", self._retrieve_rag_context, case_id, question, True)
+        )
+
+        try:
+            intent = await _timed("classify", self._classify_chat_intent, question)
+            if intent != "QUESTION":
+                retrieval_task.cancel()
+            history = await history_task
+        except BaseException:
+            history_task.cancel()
+            retrieval_task.cancel()
+            raise
+        finally:
+            retrieval_task.add_done_callback(_consume_result)
 
+        # ----------------------------------------
+        # 4. GREETING handling
+        # ----------------------------------------
+        if intent == "GREETING":
             return {
-                "answer": answer,
-                "source_chunks": []
+                "request": {
+                    "messages": [
+                        {
+                            "role": "system",
+                            "content": (
+                                "Reply naturally and conversationally to greetings. "
+                                "Be friendly and human-like."
+                            )
+                        },
+                        {
+                            "role": "user",
+                            "content": question
+                        }
+                    ],
+                    "temperature": 0.8,
+                    "max_tokens": 50,
+                    "call_site": "chat_greeting"
+                },
+                "persist": True
             }
 
         # ----------------------------------------
@@ -376,27 +575,14 @@ class QAService:
                 "content": question
             })
 
-            completion = client.chat.completions.create(
-                model=settings.AZURE_OPENAI_CHAT_DEPLOYMENT,
-                messages=messages,
-                temperature=0,
-                max_tokens=200
-            )
-
-            answer = completion.choices[0].message.content.strip()
-
-            self.db.add(
-                models.ChatMessage(
-                    session_id=session_id,
-                    role="assistant",
-                    content=answer
-                )
-            )
-            self.db.commit()
-
             return {
-                "answer": answer,
-                "source_chunks": []
+                "request": {
+                    "messages": messages,
+                    "temperature": 0,
+                    "max_tokens": 200,
+                    "call_site": "chat_memory"
+                },
+                "persist": True
             }
 
         # ----------------------------------------
@@ -421,60 +607,65 @@ class QAService:
                 "content": question
             })
 
-            completion = client.chat.completions.create(
-                model=settings.AZURE_OPENAI_CHAT_DEPLOYMENT,
-                messages=messages,
-                temperature=0,
-                max_tokens=200
-            )
-
-            answer = completion.choices[0].message.content.strip()
-
-            self.db.add(
-                models.ChatMessage(
-                    session_id=session_id,
-                    role="assistant",
-                    content=answer
-                )
-            )
-            self.db.commit()
-
             return {
-                "answer": answer,
-                "source_chunks": []
+                "request": {
+                    "messages": messages,
+                    "temperature": 0,
+                    "max_tokens": 200,
+                    "call_site": "chat_follow_up"
+                },
+                "persist": True
             }
 
         # ----------------------------------------
         # 7. Normal RAG question
         # ----------------------------------------
-        result = self._generate_rag_answer(
-            case_id=case_id,
-            question=question,
-            conversation_history=history
-        )
+        context = await retrieval_task
+        plan = self._rag_plan(case_id, question, context, history)
+        plan["persist"] = True
+        return plan
 
-        # ----------------------------------------
-        # 8. Save assistant answer
-        # ----------------------------------------
-        try:
-            self.db.add(
-                models.ChatMessage(
-                    session_id=session_id,
-                    role="assistant",
-                    content=result["answer"]
-                )
-            )
-            self.db.commit()
-        except Exception:
-            self.db.rollback()
+    async def answer_chat_question(
+        self,
+        case_id: int,
+        question: str,
+        session_id: int
+    ):
+        plan = await _timed("plan", self._plan_chat_answer, case_id, question, session_id)
+        result = await _timed("completion", self._complete_plan, plan)
+
+        if plan.get("persist"):
+            await run_in_threadpool(self._save_assistant_message, session_id, result["answer"])
 
         return result
-    
-    def answer_voice_question(
+
+    async def stream_chat_answer(
         self,
         case_id: int,
-        question: str
+        question: str,
+        session_id: int
     ):
+        """
+        Streaming variant of answer_chat_question. The assistant message is
+        saved once the stream has completed.
+        """
+        started = time.perf_counter()
+        plan = await _timed("plan", self._plan_chat_answer, case_id, question, session_id)
+
+        async for event, payload in self._stream_plan(plan, "chat", started):
+            if event == "done" and plan.get("persist"):
+                await run_in_threadpool(self._save_assistant_message, session_id, payload["answer"])
+            yield event, payload
+
+    # -------------------------
+    # Voice answers
+    # -------------------------
+    async def _plan_voice_answer(
+        self,
+        case_id: int,
+        question: str,
+        own_session: bool = False
+    ) -> Dict[str, Any]:
         # ----------------------------------------
         # 1. Clean raw speech text
         # ----------------------------------------
@@ -482,8 +673,10 @@ class QAService:
 
         if not question:
             return {
-                "answer": "Sorry, I didn't catch that. Could you repeat?",
-                "source_chunks": []
+                "result": {
+                    "answer": "Sorry, I didn't catch that. Could you repeat?",
+                    "source_chunks": []
+                }
             }
 
         # ----------------------------------------
@@ -525,7 +718,7 @@ class QAService:
     {question}
     """
 
-        refine_response = client.chat.completions.create(
+        refine_response = await async_client.chat.completions.create(
             model=settings.AZURE_OPENAI_CHAT_DEPLOYMENT,
             messages=[
                 {
@@ -542,11 +735,10 @@ class QAService:
             ],
             temperature=0,
             max_tokens=150,
-            response_format={"type": "json_object"}
+            response_format={"type": "json_object"},
+            call_site="voice_refine"
         )
 
-        import json
-
         try:
             parsed = json.loads(
                 refine_response.choices[0].message.content
@@ -565,13 +757,12 @@ class QAService:
         # 3. Greeting handling
         # ----------------------------------------
         if intent == "GREETING":
-
-            greeting_response = client.chat.completions.create(
-                model=settings.AZURE_OPENAI_CHAT_DEPLOYMENT,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """
+            return {
+                "request": {
+                    "messages": [
+                        {
+                            "role": "system",
+                            "content": """
     You are a professional AI voice assistant.
 
     Rules:
@@ -580,38 +771,28 @@ class QAService:
     - Voice friendly
     - Do not give long explanations
     """
-                    },
-                    {
-                        "role": "user",
-                        "content": refined_question
-                    }
-                ],
-                temperature=0.5,
-                max_tokens=60
-            )
-
-            return {
-                "answer": (
-                    greeting_response
-                    .choices[0]
-                    .message
-                    .content
-                    .strip()
-                ),
-                "source_chunks": []
+                        },
+                        {
+                            "role": "user",
+                            "content": refined_question
+                        }
+                    ],
+                    "temperature": 0.5,
+                    "max_tokens": 60,
+                    "call_site": "voice_greeting"
+                }
             }
 
         # ----------------------------------------
         # 4. General chat handling
         # ----------------------------------------
         if intent == "GENERAL_CHAT":
-
-            general_response = client.chat.completions.create(
-                model=settings.AZURE_OPENAI_CHAT_DEPLOYMENT,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """
+            return {
+                "request": {
+                    "messages": [
+                        {
+                            "role": "system",
+                            "content": """
     You are a helpful AI voice assistant.
 
     Rules:
@@ -620,35 +801,89 @@ class QAService:
     - Natural conversational style
     - Avoid very long answers
     """
-                    },
-                    {
-                        "role": "user",
-                        "content": refined_question
-                    }
-                ],
-                temperature=0.5,
-                max_tokens=120
-            )
-
-            return {
-                "answer": (
-                    general_response
-                    .choices[0]
-                    .message
-                    .content
-                    .strip()
-                ),
-                "source_chunks": []
+                        },
+                        {
+                            "role": "user",
+                            "content": refined_question
+                        }
+                    ],
+                    "temperature": 0.5,
+                    "max_tokens": 120,
+                    "call_site": "voice_general"
+                }
             }
 
         # ----------------------------------------
         # 5. Case-specific RAG answer
         # ----------------------------------------
-        return self._generate_rag_answer(
+        return await self._plan_rag_answer(
             case_id=case_id,
-            question=refined_question
+            question=refined_question,
+            own_session=own_session
         )
 
+    async def _voice_plan(self, case_id: int, question: str) -> Dict[str, Any]:
+        """
+        The prefetched plan when the transcript's candidate question was
+        prefetched, otherwise a freshly computed one.
+        """
+        if settings.VOICE_PREFETCH_ENABLED:
+            prefetched = voice_prefetch.take(
+                case_id,
+                self._clean_question(question).strip()
+            )
+            if prefetched is not None:
+                try:
+                    return await prefetched
+                except Exception:
+                    logger.exception("Voice prefetch failed, planning again")
+
+        return await self._plan_voice_answer(case_id, question)
+
+    async def prefetch_voice_answer(self, case_id: int, lines: List[str]) -> Dict[str, Any]:
+        """
+        Add transcript lines for the case's meeting and start preparing the
+        answer (refine, intent, retrieval) for its latest candidate question.
+        """
+        transcript = voice_prefetch.append(case_id, lines)
+        question = self._clean_question("\n".join(transcript)).strip()
+
+        started = False
+        if settings.VOICE_PREFETCH_ENABLED and len(question) > 10:
+            # own_session: the prefetch outlives this request's DB session
+            started = voice_prefetch.start(
+                case_id,
+                question,
+                lambda: self._plan_voice_answer(case_id, question, own_session=True)
+            )
+
+        return {
+            "candidate_question": question,
+            "prefetch_started": started
+        }
+
+    async def answer_voice_question(
+        self,
+        case_id: int,
+        question: str
+    ):
+        plan = await self._voice_plan(case_id, question)
+        return await self._complete_plan(plan)
+
+    async def stream_voice_answer(
+        self,
+        case_id: int,
+        question: str
+    ):
+        """
+        Streaming variant of answer_voice_question, so the bot can start speaking early.
+        """
+        started = time.perf_counter()
+        plan = await self._voice_plan(case_id, question)
+
+        async for event, payload in self._stream_plan(plan, "voice", started):
+            yield event, payload
+
     # -------------------------
     # NEW: Case metadata extraction
     # -------------------------
@@ -683,33 +918,25 @@ class QAService:
         Extracts structured case metadata from embeddings of a single file.
         Returns a dict (possibly empty) with the extracted fields.
         """
-        embeddings = (
-            self.db.query(models.embedding.Embedding)
+        has_chunks = (
+            self.db.query(models.embedding.Embedding.id)
             .filter(models.embedding.Embedding.file_id == file_id)
-            .all()
+            .first()
         )
-        if not embeddings:
+        if not has_chunks:
             return {}
 
-        # generic summary query to find informative chunks
-        query = "case parties court judge lawyer filing date evidence next hearing deadline attorney"
-
-        embedding_response = client.embeddings.create(
-            model=settings.AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
-            input=query,
-        )
-        query_vector = embedding_response.data[0].embedding
-        vectors = [e.vector for e in embeddings]
-        similarities = self._cos_similarities(query_vector, vectors)
+        query_vector = self.embedding_service.embed_query(METADATA_QUERY)
 
         TOP_K = 8
-        top_indices = sorted(
-            range(len(similarities)),
-            key=lambda i: similarities[i],
-            reverse=True,
-        )[:TOP_K]
+        top_chunks = self.retrieval.search_file(file_id, query_vector, limit=TOP_K)
+        if not top_chunks:
+            return {}
 
-        context = "\n\n".join(embeddings[i].chunk_text for i in top_indices)
+        chunk_texts = self.retrieval.fetch_chunk_texts([c["id"] for c in top_chunks])
+        context = "\n\n".join(
+            chunk_texts[c["id"]] for c in top_chunks if c["id"] in chunk_texts
+        )
 
         prompt = f"""
 You are a legal AI assistant.
@@ -739,6 +966,7 @@ Document:
             messages=[{"role": "user", "content": prompt}],
             max_tokens=700,
             temperature=0,
+            call_site="metadata_extract",
         )
 
         raw = completion.choices[0].message.content.strip()
@@ -0,0 +1,295 @@
+# app/services/retrieval_service.py
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.config import settings
+from app.core.vector_cache import normalize_rows, vector_cache
+from app.utils.lexical import query_terms
+from app.utils.vector_codec import row_vector
+
+logger = logging.getLogger(__name__)
+
+Embedding = models.embedding.Embedding
+CaseFile = models.case_file.CaseFile
+
+# whether the installed pgvector has hnsw.iterative_scan (0.8+); checked once per process
+_iterative_scan_supported: Optional[bool] = None
+
+
+class RetrievalService:
+    """
+    Nearest-chunk search for a case or a single file.
+
+    Every search returns at most `limit` dicts ordered by similarity:
+        {"id": int, "similarity": float}
+    An empty list means there is nothing indexed to search.
+
+    Searches only touch ids and vectors; callers fetch chunk_text for the
+    chunks they actually use with `fetch_chunk_texts`.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @property
+    def backend(self) -> str:
+        if (settings.EMBEDDING_STORAGE_MODE or "pgvector").lower() != "pgvector":
+            # bytea vectors can't be searched in SQL
+            return "memory"
+        return (settings.VECTOR_SEARCH_BACKEND or "pgvector").lower()
+
+    # -------------------------
+    # Public API
+    # -------------------------
+    def search_case(self, case_id: int, query_vector: Sequence[float], limit: int) -> List[Dict[str, Any]]:
+        if self.backend == "memory":
+            return self._search_case_in_memory(case_id, query_vector, limit)
+        return self._search_pgvector(CaseFile.case_id == case_id, query_vector, limit)
+
+    @property
+    def fused_search_enabled(self) -> bool:
+        return (
+            (settings.RAG_RETRIEVAL_MODE or "hybrid").lower() == "rrf"
+            and self.backend == "pgvector"
+        )
+
+    def search_case_fused(
+        self,
+        case_id: int,
+        query_vector: Sequence[float],
+        question: str,
+        limit: int,
+    ) -> List[Dict[str, Any]]:
+        """
+        Reciprocal-rank fusion of the pgvector top-k and the ts_rank top-k, in one round trip.
+        Results are ordered by fused score and carry it as "rrf".
+        """
+        terms = query_terms(question)
+        params = {
+            "case_id": case_id,
+            "q": _vector_literal(query_vector),
+            "tsq": " | ".join(terms),
+            "has_terms": bool(terms),
+            "pool": limit,
+            "rrf_k": settings.RAG_RRF_K,
+        }
+
+        self._prepare_hnsw_scan()
+        rows = self.db.execute(_FUSED_SEARCH_SQL, params).fetchall()
+
+        # fewer vector hits than asked for: the ANN scan may have been cut short by the case filter
+        if not rows or rows[0].vec_hits < limit:
+            self._prepare_exact_scan()
+            rows = self.db.execute(_FUSED_SEARCH_SQL, params).fetchall()
+            self._restore_index_scan()
+
+        return [
+            {
+                "id": r.id,
+                "similarity": float(r.similarity),
+                "rrf": float(r.rrf),
+            }
+            for r in rows
+        ]
+
+    def search_file(self, file_id: int, query_vector: Sequence[float], limit: int) -> List[Dict[str, Any]]:
+        if self.backend == "memory":
+            return self._search_file_in_memory(file_id, query_vector, limit)
+        return self._search_pgvector(Embedding.file_id == file_id, query_vector, limit)
+
+    def fetch_chunk_texts(self, embedding_ids: Sequence[int]) -> Dict[int, str]:
+        """
+        chunk_text for the given ids in one IN query. Ids deleted in the meantime are absent.
+        """
+        if not embedding_ids:
+            return {}
+
+        rows = (
+            self.db.query(Embedding.id, Embedding.chunk_text)
+            .filter(Embedding.id.in_(list(embedding_ids)))
+            .all()
+        )
+        return {r.id: r.chunk_text for r in rows}
+
+    # -------------------------
+    # pgvector (SQL-side ANN)
+    # -------------------------
+    def _search_pgvector(self, condition, query_vector: Sequence[float], limit: int) -> List[Dict[str, Any]]:
+        distance = Embedding.vector.cosine_distance(list(query_vector))
+
+        query = (
+            self.db.query(
+                Embedding.id,
+                distance.label("distance"),
+            )
+            .join(CaseFile)
+            .filter(condition, Embedding.vector.isnot(None))
+            .order_by(distance)
+            .limit(limit)
+        )
+
+        self._prepare_hnsw_scan()
+        rows = query.all()
+
+        if len(rows) < limit:
+            # either the case/file really has fewer rows, or the ANN scan ran out
+            # before the filter matched enough of them; an exact scan settles it
+            self._prepare_exact_scan()
+            rows = query.all()
+            self._restore_index_scan()
+
+        # relaxed_order iterative scans may return neighbours slightly out of order
+        return sorted(
+            (
+                {
+                    "id": r.id,
+                    "similarity": 1.0 - float(r.distance),
+                }
+                for r in rows
+            ),
+            key=lambda r: -r["similarity"],
+        )
+
+    def _prepare_hnsw_scan(self):
+        # SET LOCAL only lives for the current transaction, i.e. this query
+        self.db.execute(text(f"SET LOCAL hnsw.ef_search = {int(settings.PGVECTOR_HNSW_EF_SEARCH)}"))
+
+        mode = (settings.PGVECTOR_ITERATIVE_SCAN or "off").lower()
+        if mode in ("relaxed_order", "strict_order") and self._iterative_scan_supported():
+            self.db.execute(text(f"SET LOCAL hnsw.iterative_scan = {mode}"))
+
+    def _prepare_exact_scan(self):
+        # no HNSW index scan: the planner reads the case's rows through the
+        # file_id index (bitmap scan) and sorts them by exact distance
+        self.db.execute(text("SET LOCAL enable_indexscan = off"))
+
+    def _restore_index_scan(self):
+        # later queries in the same transaction (chunk texts by id) want their indexes back
+        self.db.execute(text("SET LOCAL enable_indexscan = on"))
+
+    def _iterative_scan_supported(self) -> bool:
+        global _iterative_scan_supported
+
+        if _iterative_scan_supported is None:
+            version = self.db.execute(
+                text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+            ).scalar()
+            try:
+                _iterative_scan_supported = tuple(int(p) for p in (version or "0").split(".")[:2]) >= (0, 8)
+            except ValueError:
+                _iterative_scan_supported = False
+            if not _iterative_scan_supported:
+                logger.info("pgvector %s has no iterative index scans; short results fall back to exact scans", version)
+
+        return _iterative_scan_supported
+
+    # -------------------------
+    # In-process (vector cache)
+    # -------------------------
+    def _search_case_in_memory(self, case_id: int, query_vector: Sequence[float], limit: int) -> List[Dict[str, Any]]:
+        index = vector_cache.get_or_load(
+            case_id,
+            lambda: self._load_vectors(CaseFile.case_id == case_id)
+        )
+
+        if not len(index):
+            return []
+
+        return _top_k(index.ids, index.similarities(query_vector), limit)
+
+    def _search_file_in_memory(self, file_id: int, query_vector: Sequence[float], limit: int) -> List[Dict[str, Any]]:
+        ids, vectors = self._load_vectors(Embedding.file_id == file_id)
+        if not ids:
+            return []
+
+        similarities = normalize_rows(vectors) @ normalize_rows(query_vector)[0]
+        return _top_k(np.asarray(ids, dtype=np.int64), similarities, limit)
+
+    def _load_vectors(self, condition):
+        """
+        Fetch only (id, vector) pairs, used to (re)build the cached index.
+        """
+        rows = (
+            self.db.query(
+                Embedding.id,
+                Embedding.vector,
+                Embedding.vector_blob,
+                Embedding.vector_scale,
+            )
+            .join(CaseFile)
+            .filter(condition)
+            .order_by(Embedding.id)
+            .all()
+        )
+        return (
+            [r.id for r in rows],
+            [row_vector(r.vector, r.vector_blob, r.vector_scale) for r in rows],
+        )
+
+
+def _top_k(ids: np.ndarray, similarities: np.ndarray, limit: int) -> List[Dict[str, Any]]:
+    """
+    Best `limit` rows by similarity via argpartition (O(n)) + a sort of the winners only.
+    """
+    k = min(limit, similarities.shape[0])
+    if k <= 0:
+        return []
+
+    top = np.argpartition(-similarities, k - 1)[:k]
+    top = top[np.argsort(-similarities[top])]
+
+    return [
+        {"id": int(ids[i]), "similarity": float(similarities[i])}
+        for i in top
+    ]
+
+
+def _vector_literal(vector: Sequence[float]) -> str:
+    return "[" + ",".join(repr(float(x)) for x in vector) + "]"
+
+
+_FUSED_SEARCH_SQL = text("""
+WITH vec AS (
+    SELECT id, row_number() OVER (ORDER BY distance) AS rnk
+    FROM (
+        SELECT e.id, e.vector <=> CAST(:q AS vector) AS distance
+        FROM embeddings e
+        JOIN case_files f ON f.id = e.file_id
+        WHERE f.case_id = :case_id AND e.vector IS NOT NULL
+        ORDER BY distance
+        LIMIT :pool
+    ) nearest
+),
+lex AS (
+    SELECT id, row_number() OVER (ORDER BY rank DESC) AS rnk
+    FROM (
+        SELECT e.id, ts_rank(e.chunk_tsv, query) AS rank
+        FROM embeddings e
+        JOIN case_files f ON f.id = e.file_id,
+             to_tsquery('english', :tsq) query
+        WHERE :has_terms AND f.case_id = :case_id AND e.chunk_tsv @@ query
+        ORDER BY rank DESC
+        LIMIT :pool
+    ) matched
+),
+fused AS (
+    SELECT COALESCE(vec.id, lex.id) AS id,
+           COALESCE(1.0 / (:rrf_k + vec.rnk), 0)
+         + COALESCE(1.0 / (:rrf_k + lex.rnk), 0) AS rrf
+    FROM vec
+    FULL OUTER JOIN lex ON lex.id = vec.id
+)
+SELECT e.id,
+       1 - (e.vector <=> CAST(:q AS vector)) AS similarity,
+       fused.rrf,
+       (SELECT count(*) FROM vec) AS vec_hits
+FROM fused
+JOIN embeddings e ON e.id = fused.id
+ORDER BY fused.rrf DESC
+LIMIT :pool
+""")
@@ -0,0 +1,83 @@
+# app/tests/test_ingestion.py
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app import models  # noqa: F401  (registers every table)
+from app.core.config import settings
+from app.db.base import Base
+from app.models.case_file import CaseFile, FileStatus
+from app.models.ingestion_job import IngestionJob, JobStatus
+from app.services.ingestion_service import IngestionService
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(settings, "INGESTION_MAX_ATTEMPTS", 2)
+
+    engine = create_engine("sqlite://")
+    # embeddings/chunk_postings use Postgres-only types; the queue only deletes by file_id
+    tables = [t for name, t in Base.metadata.tables.items() if name not in ("embeddings", "chunk_postings")]
+    Base.metadata.create_all(engine, tables=tables)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE embeddings (id INTEGER PRIMARY KEY, file_id INTEGER)"))
+
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _running_job(db, attempts: int) -> IngestionJob:
+    file = CaseFile(case_id=1, filename="bundle.pdf", status=FileStatus.PROCESSING)
+    db.add(file)
+    db.flush()
+    job = IngestionJob(
+        file_id=file.id,
+        status=JobStatus.RUNNING,
+        attempts=attempts,
+        locked_by="dead-worker",
+        lease_expires_at=datetime.utcnow() - timedelta(seconds=1),
+    )
+    db.add(job)
+    db.commit()
+    return job
+
+
+def test_expired_lease_is_reclaimed_while_attempts_remain(db):
+    job = _running_job(db, attempts=1)
+
+    claimed = IngestionService(db).claim("worker-2")
+
+    assert claimed is not None and claimed.id == job.id
+    assert claimed.locked_by == "worker-2"
+    assert claimed.attempts == 2
+
+
+def test_expired_lease_on_last_attempt_fails_job_without_fail_call(db):
+    job = _running_job(db, attempts=2)
+    db.execute(text("INSERT INTO embeddings (file_id) VALUES (:f)"), {"f": job.file_id})
+    db.commit()
+
+    assert IngestionService(db).claim("worker-2") is None
+
+    db.expire_all()
+    assert job.status == JobStatus.FAILED
+    assert job.locked_by is None
+    assert job.finished_at is not None
+    assert job.file.status == FileStatus.REJECTED
+    assert db.execute(text("SELECT COUNT(*) FROM embeddings")).scalar() == 0
+
+
+def test_retryable_failure_requeues_and_drops_partial_chunks(db):
+    job = _running_job(db, attempts=1)
+    db.execute(text("INSERT INTO embeddings (file_id) VALUES (:f)"), {"f": job.file_id})
+    db.commit()
+
+    IngestionService(db).fail(job.id, "dead-worker", RuntimeError("embedding service unavailable"))
+
+    db.expire_all()
+    assert job.status == JobStatus.QUEUED
+    assert job.file.status == FileStatus.APPROVED
+    assert db.execute(text("SELECT COUNT(*) FROM embeddings")).scalar() == 0
@@ -0,0 +1,86 @@
+# app/tests/test_retrieval.py
+"""
+pgvector retrieval against a real Postgres. Set TEST_DATABASE_URL to a
+disposable database with the vector extension available; the tables are
+created and dropped by the test.
+"""
+import os
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import sessionmaker
+
+from app import models  # noqa: F401  (registers every table)
+from app.core.config import settings
+from app.db.base import Base
+from app.models.case import Case
+from app.models.case_file import CaseFile, FileStatus
+from app.models.embedding import Embedding
+from app.services.retrieval_service import RetrievalService
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL not set")
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_STORAGE_MODE", "pgvector")
+    monkeypatch.setattr(settings, "VECTOR_SEARCH_BACKEND", "pgvector")
+    monkeypatch.setattr(settings, "PGVECTOR_HNSW_EF_SEARCH", 40)
+
+    engine = create_engine(TEST_DATABASE_URL)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+    Base.metadata.create_all(engine)
+
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    Base.metadata.drop_all(engine)
+
+
+def _add_case(db, name: str, vectors: np.ndarray) -> int:
+    case = Case(case_name=name, case_no=name)
+    db.add(case)
+    db.flush()
+    file = CaseFile(case_id=case.id, filename=f"{name}.pdf", status=FileStatus.PROCESSED)
+    db.add(file)
+    db.flush()
+    db.execute(
+        insert(Embedding),
+        [{"file_id": file.id, "chunk_text": f"{name} {i}", "vector": v.tolist()} for i, v in enumerate(vectors)],
+    )
+    db.commit()
+    return case.id
+
+
+def test_small_case_in_large_table_gets_full_top_k(db):
+    rng = np.random.default_rng(0)
+    dims = settings.EMBEDDING_DIMENSIONS
+    query = rng.normal(size=dims)
+
+    # a big case whose chunks all sit right next to the query, so the HNSW
+    # scan's first ~ef_search candidates all belong to it
+    _add_case(db, "large", query + rng.normal(scale=0.01, size=(3000, dims)))
+    small_case_id = _add_case(db, "small", rng.normal(size=(5, dims)))
+
+    results = RetrievalService(db).search_case(small_case_id, query.tolist(), limit=5)
+
+    assert len(results) == 5
+    similarities = [r["similarity"] for r in results]
+    assert similarities == sorted(similarities, reverse=True)
+
+
+def test_small_case_in_large_table_gets_full_fused_pool(db):
+    rng = np.random.default_rng(1)
+    dims = settings.EMBEDDING_DIMENSIONS
+    query = rng.normal(size=dims)
+
+    _add_case(db, "large", query + rng.normal(scale=0.01, size=(3000, dims)))
+    small_case_id = _add_case(db, "small", rng.normal(size=(5, dims)))
+
+    results = RetrievalService(db).search_case_fused(small_case_id, query.tolist(), "unmatched", limit=5)
+
+    assert len(results) == 5
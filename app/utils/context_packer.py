@@ -0,0 +1,90 @@
+# app/utils/context_packer.py
+"""
+Token-budgeted assembly of RAG prompts.
+
+The system prompt and the question are always sent. Room is reserved for
+the best chunk (up to half the budget), history gets what it needs of the
+rest (oldest turns dropped first), and ranked chunks fill what is left: the
+best chunks go in whole, the first one that doesn't fit is trimmed, and
+lower-ranked ones are dropped.
+"""
+from typing import Dict, List, Optional, Sequence
+
+from app.utils.tokens import MESSAGE_OVERHEAD_TOKENS, count_tokens, message_tokens, truncate_to_tokens
+
+CONTEXT_HEADER = "Case file context:\n"
+
+
+def source_block(index: int, chunk: str) -> str:
+    return f"[SOURCE {index + 1}]\n{chunk}"
+
+
+def pack_rag_prompt(
+    system_prompt: str,
+    question: str,
+    chunks: Sequence[str],
+    history: Optional[List[Dict[str, str]]],
+    budget: int,
+    min_chunk_tokens: int = 64,
+):
+    """
+    Returns (messages, kept, section_tokens):
+    - messages: system, history..., context, question
+    - kept: indices into `chunks` that made it into the context, in rank order
+    - section_tokens: {"system", "history", "context", "question", "total"}
+    """
+    system_message = {"role": "system", "content": system_prompt}
+    question_message = {"role": "user", "content": question}
+
+    remaining = budget - message_tokens(system_message) - message_tokens(question_message)
+
+    # history: keep the newest messages that fit, leaving room for the best chunk
+    # (up to half the budget)
+    history = list(history or [])
+    history_tokens = [message_tokens(m) for m in history]
+    reserve = MESSAGE_OVERHEAD_TOKENS + count_tokens(CONTEXT_HEADER)
+    if chunks:
+        reserve += min(count_tokens(source_block(0, chunks[0])), budget // 2)
+    while history and sum(history_tokens) > remaining - reserve:
+        # the session summary (leading system message) goes last
+        drop = 1 if history[0]["role"] == "system" and len(history) > 1 else 0
+        history.pop(drop)
+        history_tokens.pop(drop)
+    remaining -= sum(history_tokens)
+
+    # chunks in rank order, "\n\n"-joined after the header
+    remaining -= MESSAGE_OVERHEAD_TOKENS + count_tokens(CONTEXT_HEADER)
+    blocks = []
+    kept = []
+    for idx, chunk in enumerate(chunks):
+        separator = 1 if blocks else 0
+        block = source_block(len(blocks), chunk)
+        cost = count_tokens(block) + separator
+
+        if cost <= remaining:
+            blocks.append(block)
+            kept.append(idx)
+            remaining -= cost
+            continue
+
+        # first chunk that doesn't fit: trim it if a useful part fits, drop the rest
+        header_cost = count_tokens(source_block(len(blocks), "")) + separator
+        room = remaining - header_cost
+        if room >= min_chunk_tokens:
+            blocks.append(source_block(len(blocks), truncate_to_tokens(chunk, room)))
+            kept.append(idx)
+        break
+
+    context_message = {"role": "system", "content": CONTEXT_HEADER + "\n\n".join(blocks)}
+
+    messages = [system_message, *history, context_message, question_message]
+
+    sections = {
+        "system": message_tokens(system_message),
+        "history": sum(history_tokens),
+        "context": message_tokens(context_message),
+        "question": message_tokens(question_message),
+    }
+    sections["total"] = sum(sections.values())
+
+    return messages, kept, sections
@@ -0,0 +1,92 @@
+# app/utils/lexical.py
+"""
+Tokenizer and BM25 scoring used by the lexical (keyword) side of retrieval.
+"""
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+MAX_TERM_LENGTH = 64
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset(
+    """
+    a an and are as at be but by for from has have he her his i if in into is it its
+    me my no not of on or our she so than that the their them then there these they
+    this to was we were what when where which who whom why will with you your
+    """.split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    if not text:
+        return []
+    return [
+        t
+        for t in _TOKEN_RE.findall(text.lower())
+        if len(t) > 1 and len(t) <= MAX_TERM_LENGTH and t not in STOPWORDS
+    ]
+
+
+def term_frequencies(text: str) -> Tuple[Dict[str, int], int]:
+    """
+    Returns ({term: tf}, document length in tokens).
+    """
+    tokens = tokenize(text)
+    return dict(Counter(tokens)), len(tokens)
+
+
+def query_terms(text: str) -> List[str]:
+    # unique, order-preserving
+    return list(dict.fromkeys(tokenize(text)))
+
+
+def bm25_scores(
+    doc_index: np.ndarray,
+    term_index: np.ndarray,
+    tf: np.ndarray,
+    doc_length: np.ndarray,
+    n_docs: int,
+    avg_doc_length: float,
+    n_slots: int,
+    doc_freq: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Vectorized BM25 over a postings list.
+
+    Each posting i says term `term_index[i]` occurs `tf[i]` times in document
+    `doc_index[i]` (a slot in [0, n_slots)) of length `doc_length[i]`.
+    Returns one score per slot. `doc_freq[t]` is the number of documents
+    containing term t; it defaults to counting the given postings, which is
+    only right when they cover the whole collection.
+    """
+    scores = np.zeros(n_slots, dtype=np.float32)
+    if tf.size == 0 or n_docs == 0:
+        return scores
+
+    df = np.bincount(term_index) if doc_freq is None else doc_freq
+    idf = np.log1p((n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+
+    tf = tf.astype(np.float32)
+    norm = BM25_K1 * (1.0 - BM25_B + BM25_B * doc_length.astype(np.float32) / max(avg_doc_length, 1e-6))
+    contrib = idf[term_index] * tf * (BM25_K1 + 1.0) / (tf + norm)
+
+    np.add.at(scores, doc_index, contrib)
+    return scores
+
+
+def posting_rows(case_id: int, chunks: Iterable[Tuple[int, str]]):
+    """
+    Yields (embedding_id, token_count, [posting dicts]) for (embedding_id, chunk_text) pairs.
+    """
+    for embedding_id, chunk in chunks:
+        tfs, length = term_frequencies(chunk)
+        yield embedding_id, length, [
+            {"embedding_id": embedding_id, "case_id": case_id, "term": term, "tf": count}
+            for term, count in tfs.items()
+        ]
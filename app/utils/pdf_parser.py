@@ -4,12 +4,21 @@
 # install: pip install pymupdf python-docx
 import io
 import logging
+import math
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, List, Optional
 
 import fitz  # PyMuPDF
 import re
 
+from app.core.config import settings
+
 logger = logging.getLogger(__name__)
 
 try:
@@ -40,40 +49,183 @@ def _clean_text(text: str) -> str:
     return text.strip()
 
 
-def _extract_text_from_doc(doc: fitz.Document) -> str:
+def _extract_page_text(page: fitz.Page) -> str:
     """
-    Core extraction logic from a PyMuPDF Document.
+    Text of one page. The page is parsed once into a TextPage that both the
+    plain-text pass and the block fallback read from.
     """
-    pages = []
+    textpage = page.get_textpage()
 
-    page_count = doc.page_count if hasattr(doc, "page_count") else len(doc)
+    # Primary extraction
+    page_text = page.get_text("text", textpage=textpage) or ""
 
-    for page_num in range(page_count):
-        try:
-            page = doc.load_page(page_num)
+    # Fallback if empty (block-based extraction)
+    if not page_text.strip():
+        blocks = page.get_text("blocks", textpage=textpage) or []
+        page_text = "\n".join(
+            block[4].strip()
+            for block in blocks
+            if len(block) > 4 and isinstance(block[4], str) and block[4].strip()
+        )
 
-            # Primary extraction
-            page_text = page.get_text("text") or ""
+    return _clean_text(page_text)
 
-            # Fallback if empty (block-based extraction)
-            if not page_text.strip():
-                blocks = page.get_text("blocks") or []
-                page_text = "\n".join(
-                    block[4].strip()
-                    for block in blocks
-                    if len(block) > 4 and isinstance(block[4], str) and block[4].strip()
-                )
 
-            page_text = _clean_text(page_text)
-            if page_text:
-                pages.append(page_text)
+def _extract_pages(doc: fitz.Document, start: int, stop: int) -> List[str]:
+    """
+    Cleaned text of pages [start, stop); "" for empty or unreadable pages.
+    """
+    pages = []
 
+    for page_num in range(start, stop):
+        try:
+            pages.append(_extract_page_text(doc.load_page(page_num)))
         except Exception:
             # Skip problematic pages instead of crashing
             logger.exception("Error extracting page %s", page_num)
-            continue
+            pages.append("")
+
+    return pages
+
+
+def _extract_text_from_doc(doc: fitz.Document) -> str:
+    """
+    Core extraction logic from a PyMuPDF Document.
+    """
+    page_count = doc.page_count if hasattr(doc, "page_count") else len(doc)
+
+    return "\n\n".join(p for p in _extract_pages(doc, 0, page_count) if p)
+
+
+# ---------------- Parallel PDF extraction ----------------
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _extract_page_range(file_path: str, start: int, stop: int) -> List[str]:
+    """
+    Runs in a pool process: open the PDF and extract one slice of its pages.
+    """
+    with fitz.open(file_path) as doc:
+        if getattr(doc, "is_encrypted", False):
+            doc.authenticate("")
+        return _extract_pages(doc, start, stop)
+
+
+def _extract_processes() -> int:
+    return settings.PDF_EXTRACT_PROCESSES or os.cpu_count() or 1
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            # spawn: callers (API, ingestion worker) run threads, which fork doesn't copy safely
+            _pool = ProcessPoolExecutor(
+                max_workers=_extract_processes(),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
 
-    return "\n\n".join(pages)
+
+def _reset_pool():
+    global _pool
+
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _iter_page_slices(file_path: str, page_count: int) -> Iterator[List[str]]:
+    """
+    Page texts slice by slice, in page order, extracted in the process pool.
+    A few slices per process keep the processes busy when some pages are
+    much heavier than others; at most two slices per process are in flight,
+    so a slow consumer holds back extraction instead of piling up text.
+
+    If a pool process dies (the pool is then unusable), the pool is reset
+    and the slices not yielded yet are extracted in this process.
+    """
+    processes = _extract_processes()
+    shard = max(1, math.ceil(page_count / (processes * 4)))
+    ranges = [(start, min(start + shard, page_count)) for start in range(0, page_count, shard)]
+
+    yielded = 0
+    pending = deque()
+    try:
+        pool = _get_pool()
+        for start, stop in ranges:
+            pending.append(pool.submit(_extract_page_range, file_path, start, stop))
+            if len(pending) >= processes * 2:
+                texts = pending.popleft().result()
+                yield texts
+                yielded += 1
+        while pending:
+            texts = pending.popleft().result()
+            yield texts
+            yielded += 1
+        return
+    except BrokenProcessPool:
+        logger.exception("PDF extraction pool broke, extracting the rest in-process: %s", file_path)
+        _reset_pool()
+    finally:
+        for future in pending:
+            future.cancel()
+
+    for start, stop in ranges[yielded:]:
+        yield _extract_page_range(file_path, start, stop)
+
+
+def _use_parallel(page_count: int) -> bool:
+    return _extract_processes() > 1 and page_count >= settings.PDF_PARALLEL_MIN_PAGES
+
+
+def iter_pdf_pages(file_path: str) -> Iterator[str]:
+    """
+    Cleaned text of each page, in order ("" for pages without text), without
+    ever holding the whole document's text. Large PDFs are read from the
+    process pool.
+    """
+    path = Path(file_path)
+    if not path.is_file():
+        logger.warning("PDF path not found: %s", file_path)
+        return
+
+    try:
+        doc = fitz.open(str(path))
+    except Exception:
+        logger.exception("Failed to open PDF: %s", file_path)
+        return
+
+    with doc:
+        if getattr(doc, "is_encrypted", False) and not doc.authenticate(""):
+            logger.warning("PDF is encrypted and requires a password: %s", file_path)
+            return
+
+        page_count = doc.page_count
+        if not _use_parallel(page_count):
+            for page_num in range(page_count):
+                try:
+                    text = _extract_page_text(doc.load_page(page_num))
+                except Exception:
+                    logger.exception("Error extracting page %s", page_num)
+                    text = ""
+                yield text
+            return
+
+    for texts in _iter_page_slices(str(path), page_count):
+        yield from texts
+
+
+def pdf_page_count(file_path: str) -> Optional[int]:
+    try:
+        with fitz.open(file_path) as doc:
+            return doc.page_count
+    except Exception:
+        return None
 
 
 def extract_text_from_pdf_bytes(pdf_bytes: bytes) -> str:
@@ -237,6 +389,20 @@ def extract_text_from_file_path(file_path: str) -> str:
         return ""
 
 
+def iter_text_pages_from_file_path(file_path: str) -> Iterator[str]:
+    """
+    Streaming counterpart of extract_text_from_file_path: PDFs page by page,
+    other formats (small in practice) as a single piece.
+    """
+    if Path(file_path or "").suffix.lower() == ".pdf":
+        yield from iter_pdf_pages(file_path)
+        return
+
+    text = extract_text_from_file_path(file_path)
+    if text:
+        yield text
+
+
 def extract_text_from_file_bytes(file_bytes: bytes, filename: Optional[str] = None) -> str:
     """
     Extract text from file bytes (PDF or DOCX). If filename is provided, use its suffix to choose.
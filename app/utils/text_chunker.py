@@ -1,4 +1,10 @@
 # app/utils/text_chunker.py
+import re
+from typing import Iterable, Iterator, List, NamedTuple, Optional
+
+from app.utils.tokens import count_tokens
+
+
 def chunk_text(text: str, chunk_size: int = 800, overlap: int = 100):
     tokens = text.split()
     chunks = []
@@ -8,3 +14,187 @@ def chunk_text(text: str, chunk_size: int = 800, overlap: int = 100):
         chunks.append(" ".join(chunk))
         i += chunk_size - overlap
     return chunks
+
+
+# ---------------- Structure-aware chunking ----------------
+
+class ChunkProfile(NamedTuple):
+    max_tokens: int  # hard limit per chunk (model tokens)
+    overlap_tokens: int  # trailing sentences repeated at the start of the next chunk
+    min_tokens: int  # at a paragraph or page break, close the chunk once it has this many
+
+
+CHUNK_PROFILES = {
+    "default": ChunkProfile(max_tokens=800, overlap_tokens=100, min_tokens=500),
+    # shorter, more focused chunks: sharper retrieval, more embedding inputs
+    "precise": ChunkProfile(max_tokens=400, overlap_tokens=50, min_tokens=250),
+    # long pleadings and judgments where context matters more than precision
+    "broad": ChunkProfile(max_tokens=1200, overlap_tokens=150, min_tokens=800),
+}
+
+
+def get_chunk_profile(name: str) -> ChunkProfile:
+    try:
+        return CHUNK_PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown chunk profile {name!r} (expected one of {', '.join(CHUNK_PROFILES)})")
+
+
+class Chunk(NamedTuple):
+    text: str
+    # offsets into the document text as extract_text_from_file_path returns
+    # it (non-empty pages joined by a blank line)
+    char_start: int
+    char_end: int
+    page_start: int  # 1-based
+    page_end: int
+    token_count: int
+
+    def metadata(self) -> dict:
+        return {
+            "char_start": self.char_start,
+            "char_end": self.char_end,
+            "page_start": self.page_start,
+            "page_end": self.page_end,
+            "token_count": self.token_count,
+        }
+
+
+# the separator extract_text_from_file_path puts between pages
+PAGE_SEPARATOR = "\n\n"
+
+_PARAGRAPH = re.compile(r"(?:[^\n]|\n(?!\s*\n))+")
+# a sentence ends at . ! or ? (plus closing quotes/brackets) followed by whitespace
+_SENTENCE = re.compile(r"\S.*?(?:[.!?][\"')\]]*(?=\s)|$)", re.S)
+_WORD = re.compile(r"\S+")
+
+
+class _Unit(NamedTuple):
+    # a sentence, or a slice of one too long for a chunk
+    text: str
+    gap: str  # document text between the previous unit and this one
+    start: int  # document offset
+    page: int
+    tokens: int
+
+
+def _page_units(page: str, max_tokens: int) -> Iterator[tuple]:
+    """
+    (start, end, tokens, paragraph_start) of the sentences of one page, in
+    page offsets. Sentences over `max_tokens` are cut at word boundaries.
+    """
+    for paragraph in _PARAGRAPH.finditer(page):
+        first = True
+        for sentence in _SENTENCE.finditer(page, paragraph.start(), paragraph.end()):
+            start, end = sentence.start(), sentence.end()
+            while end > start and page[end - 1].isspace():
+                end -= 1
+            if end == start:
+                continue
+
+            # +1 for the whitespace joining it to the previous sentence
+            tokens = count_tokens(page[start:end]) + 1
+            if tokens <= max_tokens:
+                yield start, end, tokens, first
+                first = False
+                continue
+
+            # no usable sentence boundary (tables, OCR runs): pack words instead
+            piece_start, piece_end, piece_tokens = None, None, 0
+            for word in _WORD.finditer(page, start, end):
+                word_tokens = count_tokens(word.group())
+                if piece_start is not None and piece_tokens + word_tokens > max_tokens:
+                    yield piece_start, piece_end, piece_tokens, first
+                    first = False
+                    piece_start, piece_tokens = None, 0
+                if piece_start is None:
+                    piece_start = word.start()
+                piece_end = word.end()
+                piece_tokens += word_tokens
+            if piece_start is not None:
+                yield piece_start, piece_end, piece_tokens, first
+                first = False
+
+
+def iter_structured_chunks(pages: Iterable[str], profile: Optional[ChunkProfile] = None) -> Iterator[Chunk]:
+    """
+    Chunk a document given page by page ("" for pages without text).
+
+    Chunks are made of whole sentences, sized by model tokens, and prefer to
+    end at paragraph and page breaks once they hold `min_tokens`. The last
+    sentences of a chunk (up to `overlap_tokens`) start the next one. Only the
+    current page and the sentences of the chunk being built are held, so the
+    document is processed in one pass whatever its size.
+    """
+    profile = profile or CHUNK_PROFILES["default"]
+    # oversized sentences are cut so that a piece still fits next to the overlap
+    unit_limit = max(1, profile.max_tokens - profile.overlap_tokens)
+
+    current: List[_Unit] = []
+    current_tokens = 0
+    has_new = False  # current holds more than the previous chunk's overlap
+    offset = 0  # document offset of the current page
+    seen_text = False
+    prev_page_end = None  # (page text, end) of the previous unit on the same page
+
+    def emit() -> Chunk:
+        first = current[0]
+        text = first.text + "".join(u.gap + u.text for u in current[1:])
+        return Chunk(
+            text=text,
+            char_start=first.start,
+            char_end=first.start + len(text),
+            page_start=first.page,
+            page_end=current[-1].page,
+            token_count=current_tokens,
+        )
+
+    def carry_overlap():
+        nonlocal current, current_tokens
+        kept, kept_tokens = [], 0
+        for unit in reversed(current):
+            if kept_tokens + unit.tokens > profile.overlap_tokens:
+                break
+            kept.append(unit)
+            kept_tokens += unit.tokens
+        current = kept[::-1]
+        current_tokens = kept_tokens
+
+    for page_no, page in enumerate(pages, start=1):
+        if not page:
+            continue
+        if seen_text:
+            offset += len(PAGE_SEPARATOR)
+        page_gap_start = True
+
+        for start, end, tokens, paragraph_start in _page_units(page, unit_limit):
+            if page_gap_start:
+                gap = PAGE_SEPARATOR + page[:start] if seen_text else ""
+            else:
+                gap = page[prev_page_end:start]
+            boundary = page_gap_start or paragraph_start
+            page_gap_start = False
+            seen_text = True
+            prev_page_end = end
+
+            unit = _Unit(page[start:end], gap, offset + start, page_no, tokens)
+
+            if current and (
+                current_tokens + tokens > profile.max_tokens
+                or (boundary and current_tokens >= profile.min_tokens)
+            ):
+                yield emit()
+                carry_overlap()
+                has_new = False
+                # the overlap must not push the new chunk over the limit
+                while current and current_tokens + tokens > profile.max_tokens:
+                    current_tokens -= current.pop(0).tokens
+
+            current.append(unit)
+            current_tokens += tokens
+            has_new = True
+
+        offset += len(page)
+
+    if has_new:
+        yield emit()
@@ -0,0 +1,81 @@
+# app/utils/tokens.py
+"""
+Local token counting for prompt budgets.
+
+Uses tiktoken with settings.TOKENIZER_ENCODING when it is installed and the
+encoding can be loaded; otherwise falls back to a ~4 characters per token
+estimate, which is close enough for English text.
+"""
+import logging
+import threading
+from typing import Dict, Iterable
+
+from app.core.config import settings
+
+try:
+    import tiktoken
+except ImportError:  # optional dependency
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# chat format overhead per message (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    global _encoding, _encoding_loaded
+
+    if _encoding_loaded:
+        return _encoding
+
+    with _encoding_lock:
+        if not _encoding_loaded:
+            if tiktoken is not None:
+                try:
+                    _encoding = tiktoken.get_encoding(settings.TOKENIZER_ENCODING)
+                except Exception as e:
+                    # the encoding file is downloaded on first use; offline hosts can't
+                    logger.warning("tiktoken encoding unavailable, estimating tokens: %s", e)
+            _encoding_loaded = True
+
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return max(1, (len(text) + 3) // 4)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Longest prefix of `text` that fits in `max_tokens`.
+    """
+    if max_tokens <= 0 or not text:
+        return ""
+
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        return encoding.decode(tokens[:max_tokens])
+
+    return text[: max_tokens * 4]
+
+
+def message_tokens(message: Dict[str, str]) -> int:
+    return MESSAGE_OVERHEAD_TOKENS + count_tokens(message.get("content") or "")
+
+
+def messages_tokens(messages: Iterable[Dict[str, str]]) -> int:
+    return sum(message_tokens(m) for m in messages)
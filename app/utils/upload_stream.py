@@ -0,0 +1,106 @@
+# app/utils/upload_stream.py
+"""
+Copy an upload to disk in fixed-size chunks instead of reading it whole.
+
+The SHA-256 is computed while copying, the size limit is enforced per
+chunk, and the file type is sniffed from the leading magic bytes before
+anything past them is written.
+"""
+import hashlib
+import os
+from typing import Optional
+
+import aiofiles
+from fastapi import UploadFile
+
+# magic bytes -> extension(s) a file with them may carry
+_MAGIC = (
+    (b"PK\x03\x04", {".docx"}),  # zip container (OOXML)
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", {".doc"}),  # OLE2 compound file
+)
+
+# PDF readers accept the %PDF- header anywhere in the first 1024 bytes
+# (BOMs, mail/HTTP junk in front of it)
+_PDF_MAGIC = b"%PDF-"
+SNIFF_BYTES = 1024
+
+
+class UploadRejected(Exception):
+    """
+    The upload was refused; the message is safe to show to the client.
+    """
+
+
+def sniff_extensions(head: bytes) -> Optional[set]:
+    """
+    Extensions consistent with the file's leading bytes (up to SNIFF_BYTES
+    of them), or None if unknown.
+    """
+    for magic, extensions in _MAGIC:
+        if head.startswith(magic):
+            return extensions
+    if _PDF_MAGIC in head[:SNIFF_BYTES]:
+        return {".pdf"}
+    return None
+
+
+async def stream_upload_to_file(
+    upload: UploadFile,
+    dest_path: str,
+    expected_ext: str,
+    max_bytes: int,
+    chunk_size: int,
+):
+    """
+    Write `upload` to `dest_path` and return (size, sha256 hex).
+
+    Data goes to a temp file next to `dest_path`, which is renamed into place
+    only when the whole upload has been accepted; on rejection or error the
+    temp file is removed and nothing is left behind.
+    """
+    # the multipart parser knows the size already when the client sent it
+    if max_bytes and upload.size is not None and upload.size > max_bytes:
+        raise UploadRejected("File too large")
+
+    tmp_path = f"{dest_path}.part"
+    digest = hashlib.sha256()
+    size = 0
+    head = b""  # leading bytes, until there are enough to sniff
+
+    try:
+        async with aiofiles.open(tmp_path, "wb") as out:
+            while True:
+                chunk = await upload.read(chunk_size)
+
+                if head is not None:
+                    head += chunk
+                    if chunk and len(head) < SNIFF_BYTES:
+                        continue
+                    if head:
+                        extensions = sniff_extensions(head)
+                        if extensions is None or expected_ext not in extensions:
+                            raise UploadRejected(f"File content does not match extension {expected_ext}")
+                    chunk, head = head, None
+
+                if not chunk:
+                    break
+
+                size += len(chunk)
+                if max_bytes and size > max_bytes:
+                    raise UploadRejected("File too large")
+
+                digest.update(chunk)
+                await out.write(chunk)
+
+        if size == 0:
+            raise UploadRejected("Empty file")
+
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+    return size, digest.hexdigest()
@@ -0,0 +1,82 @@
+# app/utils/vector_codec.py
+"""
+Encoding of embedding vectors for the compact storage modes.
+
+Modes (settings.EMBEDDING_STORAGE_MODE):
+- "pgvector": vector column only (searchable in SQL)
+- "float32":  vector_blob = raw little-endian float32 bytes, vector_scale = NULL
+- "int8":     vector_blob = int8 bytes, vector_scale = per-vector dequantization scale
+
+Vectors are L2-normalized before they are written in every mode, so scoring
+a query against stored vectors is a single dot product.
+"""
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+STORAGE_MODES = ("pgvector", "float32", "int8")
+
+
+def normalize_vector(vector: Sequence[float]) -> np.ndarray:
+    v = np.array(vector, dtype=np.float32, copy=True)
+    norm = float(np.linalg.norm(v))
+    if norm > 0:
+        v /= norm
+    return v
+
+
+def encode_blob(vector: Sequence[float], mode: str):
+    """
+    Returns (blob, scale) for a compact mode.
+    """
+    v = normalize_vector(vector)
+
+    if mode == "float32":
+        return v.astype("<f4").tobytes(), None
+
+    if mode == "int8":
+        peak = float(np.max(np.abs(v))) if v.size else 0.0
+        scale = peak / 127.0 if peak > 0 else 1.0
+        q = np.clip(np.rint(v / scale), -127, 127).astype(np.int8)
+        return q.tobytes(), scale
+
+    raise ValueError(f"Unsupported compact embedding storage mode: {mode}")
+
+
+def decode_blob(blob: bytes, scale: Optional[float]) -> np.ndarray:
+    """
+    The blob is self-describing through `scale`: int8 rows carry one, float32 rows don't.
+    """
+    if scale is None:
+        return np.frombuffer(blob, dtype="<f4").astype(np.float32)
+    return np.frombuffer(blob, dtype=np.int8).astype(np.float32) * np.float32(scale)
+
+
+def embedding_columns(vector: Sequence[float], mode: str) -> Dict[str, Any]:
+    """
+    Column values for an Embedding row in the given storage mode.
+    """
+    mode = (mode or "pgvector").lower()
+
+    if mode == "pgvector":
+        return {
+            "vector": normalize_vector(vector),
+            "vector_blob": None,
+            "vector_scale": None,
+        }
+
+    blob, scale = encode_blob(vector, mode)
+    return {
+        "vector": None,
+        "vector_blob": blob,
+        "vector_scale": scale,
+    }
+
+
+def row_vector(vector: Any, blob: Optional[bytes], scale: Optional[float]) -> np.ndarray:
+    """
+    Vector of a stored row, whichever format it was written in.
+    """
+    if vector is not None:
+        return np.asarray(vector, dtype=np.float32)
+    return decode_blob(blob, scale)
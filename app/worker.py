@@ -0,0 +1,190 @@
+# app/worker.py
+"""
+Ingestion worker: trains approved files queued by the API (ingestion_jobs).
+
+    python -m app.worker                 # INGESTION_WORKER_PROCESSES processes
+    python -m app.worker --processes 4
+
+Each process claims one job at a time. While a job runs, a heartbeat thread
+renews its lease and stores progress; if the process dies, the lease lapses
+and another process picks the job up again.
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+from typing import Optional
+
+from app.core.config import settings
+from app.core.logging import configure_logging
+from app.db.session import SessionLocal
+from app.services.ingestion_service import IngestionService
+
+logger = logging.getLogger(__name__)
+
+# how often progress is written while a job runs (lease renewal is less frequent)
+_PROGRESS_FLUSH_SECONDS = 1.0
+
+
+class LeaseLost(Exception):
+    pass
+
+
+class JobHeartbeat(threading.Thread):
+    """
+    Renews the job's lease every INGESTION_HEARTBEAT_SECONDS and writes
+    progress as it changes, each time in a session of its own. Once the lease
+    is lost, the next progress() call raises LeaseLost to stop the run.
+    """
+
+    def __init__(self, job_id: int, worker_id: str):
+        super().__init__(name=f"heartbeat-{job_id}", daemon=True)
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.chunks_done = 0
+        self.chunks_total: Optional[int] = None
+        self._dirty = False
+        self._lost = False
+        self._stop_event = threading.Event()
+
+    def progress(self, done: int, total: int):
+        if self._lost:
+            raise LeaseLost(f"ingestion job {self.job_id}: lease lost")
+        self.chunks_done, self.chunks_total = done, total
+        self._dirty = True
+
+    def run(self):
+        last_beat = time.monotonic()
+        while not self._stop_event.wait(_PROGRESS_FLUSH_SECONDS):
+            if not self._dirty and time.monotonic() - last_beat < settings.INGESTION_HEARTBEAT_SECONDS:
+                continue
+            self._dirty = False
+            last_beat = time.monotonic()
+
+            db = SessionLocal()
+            try:
+                if not IngestionService(db).heartbeat(self.job_id, self.worker_id, self.chunks_done, self.chunks_total):
+                    # another worker took over; complete()/fail() won't touch the job
+                    logger.warning("ingestion job %s: lease lost", self.job_id)
+                    self._lost = True
+                    return
+            except Exception as e:
+                logger.warning("ingestion job %s: heartbeat failed: %s", self.job_id, e)
+            finally:
+                db.close()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def run_job(job_id: int, file_id: int, extract_metadata: bool, worker_id: str):
+    # imported here: pulls in the QA stack, which the queue bookkeeping doesn't need
+    from app.services.case_service import CaseService
+
+    heartbeat = JobHeartbeat(job_id, worker_id)
+    heartbeat.start()
+
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        result = CaseService(db).process_file_and_extract_metadata(
+            file_id,
+            extract_metadata=extract_metadata,
+            progress=heartbeat.progress,
+        )
+        if result.get("processed") is False:
+            # the run was abandoned (taken over, or the file's rows weren't its own)
+            raise RuntimeError(result.get("message") or "file was not processed")
+    except Exception as e:
+        heartbeat.stop()
+        logger.exception("ingestion job %s (file %s) failed", job_id, file_id)
+        IngestionService(db).fail(job_id, worker_id, e)
+    else:
+        heartbeat.stop()
+        IngestionService(db).complete(job_id, worker_id, result)
+        logger.info("ingestion job %s (file %s) done in %.1fs", job_id, file_id, time.perf_counter() - started)
+    finally:
+        db.close()
+
+
+def worker_loop(stop: threading.Event):
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    logger.info("ingestion worker %s started", worker_id)
+
+    while not stop.is_set():
+        db = SessionLocal()
+        try:
+            job = IngestionService(db).claim(worker_id)
+            claimed = (job.id, job.file_id, job.extract_metadata) if job else None
+        except Exception as e:
+            logger.warning("ingestion worker %s: claim failed: %s", worker_id, e)
+            claimed = None
+        finally:
+            db.close()
+
+        if claimed is None:
+            stop.wait(settings.INGESTION_POLL_SECONDS)
+            continue
+
+        run_job(*claimed, worker_id=worker_id)
+
+    logger.info("ingestion worker %s stopped", worker_id)
+
+
+def _process_main():
+    configure_logging()
+
+    # finish the current job on SIGTERM/SIGINT; an unfinished one is reclaimed after its lease
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    worker_loop(stop)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--processes", type=int, default=settings.INGESTION_WORKER_PROCESSES)
+    args = parser.parse_args()
+
+    configure_logging()
+
+    if args.processes <= 1:
+        _process_main()
+        return
+
+    # spawn: every process opens its own DB pool and HTTP clients
+    ctx = multiprocessing.get_context("spawn")
+    stopping = threading.Event()
+
+    def shutdown(*_):
+        stopping.set()
+        for proc in procs:
+            if proc.is_alive():
+                proc.terminate()
+
+    procs = [ctx.Process(target=_process_main, name=f"ingestion-{i}") for i in range(args.processes)]
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    for proc in procs:
+        proc.start()
+
+    # replace processes that die unexpectedly
+    while not stopping.is_set():
+        for i, proc in enumerate(procs):
+            if not proc.is_alive() and not stopping.is_set():
+                logger.warning("%s exited with %s, restarting", proc.name, proc.exitcode)
+                procs[i] = ctx.Process(target=_process_main, name=proc.name)
+                procs[i].start()
+        stopping.wait(1.0)
+
+    for proc in procs:
+        proc.join()
+
+
+if __name__ == "__main__":
+    main()
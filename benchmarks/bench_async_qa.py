@@ -0,0 +1,92 @@
+# benchmarks/bench_async_qa.py
+"""
+Sync vs async Azure OpenAI client under concurrent QA load.
+
+Each simulated question does what the RAG path does over the network:
+one embeddings call, then one chat completion, against a local fake server.
+
+- sync:  AzureOpenAI in a 40-worker thread pool (Starlette's default for sync handlers)
+- async: AsyncAzureOpenAI with every question awaited concurrently on one event loop
+
+    python -m benchmarks.bench_async_qa --questions 400 --latency 2.0
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from openai import AsyncAzureOpenAI, AzureOpenAI
+
+from benchmarks.fake_openai import serve_in_background
+
+API_VERSION = "2024-02-01"
+THREADPOOL_WORKERS = 40
+
+
+def _ask_sync(client: AzureOpenAI, i: int):
+    client.embeddings.create(model="emb", input=f"question {i}")
+    client.chat.completions.create(
+        model="chat",
+        messages=[{"role": "user", "content": f"question {i}"}],
+        max_tokens=300,
+    )
+
+
+async def _ask_async(client: AsyncAzureOpenAI, i: int):
+    await client.embeddings.create(model="emb", input=f"question {i}")
+    await client.chat.completions.create(
+        model="chat",
+        messages=[{"role": "user", "content": f"question {i}"}],
+        max_tokens=300,
+    )
+
+
+def run_sync(endpoint: str, questions: int) -> float:
+    client = AzureOpenAI(
+        api_key="fake",
+        api_version=API_VERSION,
+        azure_endpoint=endpoint,
+    )
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=THREADPOOL_WORKERS) as pool:
+        list(pool.map(lambda i: _ask_sync(client, i), range(questions)))
+    return time.perf_counter() - start
+
+
+async def run_async(endpoint: str, questions: int) -> float:
+    client = AsyncAzureOpenAI(
+        api_key="fake",
+        api_version=API_VERSION,
+        azure_endpoint=endpoint,
+    )
+    start = time.perf_counter()
+    await asyncio.gather(*(_ask_async(client, i) for i in range(questions)))
+    elapsed = time.perf_counter() - start
+    await client.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, default=400)
+    parser.add_argument("--latency", type=float, default=2.0, help="fake server latency per call (s)")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    server = serve_in_background(args.port, args.latency)
+    endpoint = f"http://127.0.0.1:{args.port}"
+
+    try:
+        sync_s = run_sync(endpoint, args.questions)
+        async_s = asyncio.run(run_async(endpoint, args.questions))
+    finally:
+        server.terminate()
+
+    print(f"questions={args.questions} latency/call={args.latency}s")
+    print(f"sync  (threadpool={THREADPOOL_WORKERS}): {sync_s:7.2f}s  {args.questions / sync_s:8.1f} q/s")
+    print(f"async (single event loop):  {async_s:7.2f}s  {args.questions / async_s:8.1f} q/s")
+    print(f"speedup: {sync_s / async_s:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
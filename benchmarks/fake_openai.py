@@ -0,0 +1,128 @@
+# benchmarks/fake_openai.py
+"""
+Minimal fake Azure OpenAI server for local benchmarks.
+
+Implements the two deployment routes the app uses, with a fixed artificial latency:
+    POST /openai/deployments/{deployment}/chat/completions
+    POST /openai/deployments/{deployment}/embeddings
+
+Run standalone:
+    python -m benchmarks.fake_openai --port 8765 --latency 0.5
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import socket
+import subprocess
+import sys
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+EMBEDDING_DIMENSIONS = 1536
+
+
+def create_app(latency: float = 0.5, stream_delay: float = 0.02) -> FastAPI:
+    app = FastAPI()
+
+    vectors = {}
+
+    def _vector(text: str):
+        # deterministic per text, built once per distinct first byte to keep the server cheap
+        seed = hashlib.sha256(text.encode("utf-8")).digest()[0]
+        if seed not in vectors:
+            vectors[seed] = [(((seed + i) % 256) / 255.0) - 0.5 for i in range(EMBEDDING_DIMENSIONS)]
+        return vectors[seed]
+
+    @app.post("/openai/deployments/{deployment}/embeddings")
+    async def embeddings(deployment: str, request: Request):
+        body = await request.json()
+        inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        await asyncio.sleep(latency)
+        return JSONResponse({
+            "object": "list",
+            "model": deployment,
+            "data": [
+                {"object": "embedding", "index": i, "embedding": _vector(text)}
+                for i, text in enumerate(inputs)
+            ],
+            "usage": {"prompt_tokens": sum(len(t.split()) for t in inputs), "total_tokens": 0},
+        })
+
+    @app.post("/openai/deployments/{deployment}/chat/completions")
+    async def chat_completions(deployment: str, request: Request):
+        body = await request.json()
+        answer = "This is a fake answer from the benchmark server."
+
+        if body.get("stream"):
+            async def events():
+                await asyncio.sleep(latency)
+                for word in answer.split(" "):
+                    chunk = {
+                        "id": "chatcmpl-fake",
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": deployment,
+                        "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}],
+                    }
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                    await asyncio.sleep(stream_delay)
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        await asyncio.sleep(latency)
+        return JSONResponse({
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": deployment,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": answer},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 100, "completion_tokens": 10, "total_tokens": 110},
+        })
+
+    return app
+
+
+def serve_in_background(port: int, latency: float, stream_delay: float = 0.02) -> subprocess.Popen:
+    """
+    Start the fake server in its own process (so it doesn't share the benchmark's GIL)
+    and wait until it accepts connections. Call .terminate() on the result when done.
+    """
+    proc = subprocess.Popen([
+        sys.executable, "-m", "benchmarks.fake_openai",
+        "--port", str(port),
+        "--latency", str(latency),
+        "--stream-delay", str(stream_delay),
+    ])
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError("fake OpenAI server did not start")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--stream-delay", type=float, default=0.02)
+    args = parser.parse_args()
+    uvicorn.run(
+        create_app(args.latency, args.stream_delay),
+        host="127.0.0.1",
+        port=args.port,
+        log_level="warning",
+        backlog=4096,
+    )